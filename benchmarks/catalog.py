@@ -0,0 +1,321 @@
+# Synthetic catalogs for the benchmark stand-in: a shop with `size` published
+# Website Items, their prices, stock, images, specifications and reviews, plus
+# a wholesale customer whose order history grows with the catalog.
+import datetime
+import random
+
+COMPANY = "Euro Plast"
+WAREHOUSE = "Stores - EP"
+PRICE_LIST = "Website Price List"
+WHOLESALE_PRICE_LIST = "Standard Selling"
+ITEM_GROUPS = ["Containers", "Bottles", "Jars", "Lids", "Trays", "Cups", "Buckets", "Crates"]
+WORDS = [
+    "clear", "round", "square", "food", "safe", "heavy",
+    "light", "stackable", "tamper", "evident", "deli", "pet",
+]
+
+RETAIL_USER = "retail@example.com"
+WHOLESALE_USER = "wholesale@example.com"
+WHOLESALE_CUSTOMER = "Bench Wholesale"
+
+SCHEMA = {
+    "Company": ({"company_name": "text", "default_warehouse": "text"}, ()),
+    "Warehouse": ({"company": "text"}, ()),
+    "Price List": ({"selling": "integer", "currency": "text"}, ()),
+    "Customer Group": ({"customer_group_name": "text"}, ()),
+    "Item": (
+        {
+            "item_code": "text",
+            "item_name": "text",
+            "item_group": "text",
+            "published_in_website": "integer",
+            "stock_uom": "text",
+            "is_stock_item": "integer",
+        },
+        ("item_group",),
+    ),
+    "Item Default": ({"company": "text", "default_warehouse": "text"}, ()),
+    "Website Item": (
+        {
+            "item_code": "text",
+            "item_name": "text",
+            "route": "text",
+            "published": "integer",
+            "image": "text",
+            "thumbnail": "text",
+            "website_image": "text",
+            "website_description": "text",
+            "web_long_description": "text",
+            "description": "text",
+            "standard_rate": "real",
+            "images": "Table:Website Item Image",
+            "website_specifications": "Table:Item Website Specification",
+        },
+        ("item_code", "route", "published,modified"),
+    ),
+    "Website Item Image": ({"image": "text"}, ()),
+    "Item Website Specification": ({"label": "text", "description": "text"}, ()),
+    "Item Price": (
+        {
+            "item_code": "text",
+            "price_list": "text",
+            "price_list_rate": "real",
+            "uom": "text",
+            "customer": "text",
+            "valid_from": "text",
+            "valid_upto": "text",
+            "selling": "integer",
+        },
+        ("item_code,price_list",),
+    ),
+    "Bin": (
+        {"item_code": "text", "warehouse": "text", "actual_qty": "real", "reserved_qty": "real"},
+        ("item_code",),
+    ),
+    "Item Review": (
+        {"item_code": "text", "customer_name": "text", "rating": "real", "review": "text"},
+        ("item_code",),
+    ),
+    "User": ({"email": "text"}, ()),
+    "Customer": (
+        {"customer_name": "text", "customer_group": "text", "email_id": "text", "default_price_list": "text"},
+        ("email_id",),
+    ),
+    "Contact": ({"first_name": "text", "email_id": "text", "phone": "text"}, ("email_id",)),
+    "Dynamic Link": ({"link_doctype": "text", "link_name": "text"}, ("link_name",)),
+    "Address": ({"address_title": "text", "address_line1": "text", "city": "text", "country": "text"}, ()),
+    "Tag Link": ({"document_type": "text", "document_name": "text", "tag": "text"}, ()),
+    "Sales Order": (
+        {"customer": "text", "transaction_date": "text", "status": "text", "grand_total": "real"},
+        ("customer,transaction_date",),
+    ),
+    "Sales Invoice": (
+        {
+            "customer": "text",
+            "posting_date": "text",
+            "status": "text",
+            "grand_total": "real",
+            "outstanding_amount": "real",
+        },
+        ("customer,posting_date",),
+    ),
+    "Payment Entry": (
+        {
+            "party_type": "text",
+            "party": "text",
+            "posting_date": "text",
+            "status": "text",
+            "paid_amount": "real",
+            "paid_to_account_currency": "text",
+            "payment_type": "text",
+        },
+        ("party,posting_date",),
+    ),
+}
+
+
+def build_catalog(db, size, seed=7):
+    rng = random.Random(seed)
+    for doctype, (fields, indexes) in SCHEMA.items():
+        db.create_table(doctype, fields, indexes)
+
+    now = datetime.datetime(2026, 1, 1)
+    db.insert_many("Company", [{"name": COMPANY, "company_name": COMPANY, "default_warehouse": WAREHOUSE}])
+    db.insert_many("Warehouse", [{"name": WAREHOUSE, "company": COMPANY}])
+    db.insert_many(
+        "Price List",
+        [
+            {"name": PRICE_LIST, "selling": 1, "currency": "EUR", "creation": "2025-01-01"},
+            {"name": WHOLESALE_PRICE_LIST, "selling": 1, "currency": "EUR", "creation": "2025-01-02"},
+        ],
+    )
+    db.insert_many(
+        "Customer Group",
+        [{"name": name, "customer_group_name": name} for name in ("Individual", "Commercial")],
+    )
+    db.singles["Stock Settings"] = {"default_warehouse": WAREHOUSE}
+
+    items, website_items, images, specs, prices, bins, reviews = [], [], [], [], [], [], []
+    for index in range(size):
+        code = f"EP-{index:06d}"
+        words = " ".join(rng.sample(WORDS, 3))
+        name = f"{words.title()} {ITEM_GROUPS[index % len(ITEM_GROUPS)][:-1]} {index}"
+        modified = (now - datetime.timedelta(minutes=index)).isoformat(sep=" ")
+        rate = round(rng.uniform(0.5, 80), 2)
+        items.append(
+            {
+                "name": code,
+                "item_code": code,
+                "item_name": name,
+                "item_group": ITEM_GROUPS[index % len(ITEM_GROUPS)],
+                "published_in_website": 1,
+                "stock_uom": "Nos",
+                "is_stock_item": 1,
+                "modified": modified,
+            }
+        )
+        website_items.append(
+            {
+                "name": f"WEB-{index:06d}",
+                "item_code": code,
+                "item_name": name,
+                "route": item_route(index),
+                "published": 1,
+                "image": f"/files/{code}.jpg",
+                "thumbnail": f"/files/{code}-thumb.jpg",
+                "website_image": f"/files/{code}.jpg",
+                "website_description": f"<p>{name} for food service and retail packaging.</p>",
+                "web_long_description": f"<p>{words} {name} made from recyclable plastic.</p>",
+                "description": name,
+                "standard_rate": rate,
+                "modified": modified,
+                "creation": modified,
+            }
+        )
+        parent = f"WEB-{index:06d}"
+        images.append(_child(f"IMG-{index}", parent, "images", image=f"/files/{code}-2.jpg"))
+        specs.append(
+            _child(f"SPEC-{index}-1", parent, "website_specifications", label="Material", description="PP")
+        )
+        specs.append(
+            _child(
+                f"SPEC-{index}-2",
+                parent,
+                "website_specifications",
+                label="Capacity",
+                description=f"{index % 50 * 100} ml",
+            )
+        )
+        prices.append(_price(f"PRICE-{index}", code, PRICE_LIST, rate))
+        prices.append(_price(f"PRICE-W-{index}", code, WHOLESALE_PRICE_LIST, round(rate * 0.8, 2)))
+        if index % 20 == 0:
+            contract_rate = round(rate * 0.7, 2)
+            prices.append(
+                _price(f"PRICE-C-{index}", code, WHOLESALE_PRICE_LIST, contract_rate, WHOLESALE_CUSTOMER)
+            )
+        bins.append(
+            {
+                "name": f"BIN-{index}",
+                "item_code": code,
+                "warehouse": WAREHOUSE,
+                "actual_qty": rng.randint(0, 500),
+                "reserved_qty": rng.randint(0, 20),
+            }
+        )
+        for review in range(index % 4):
+            reviews.append(
+                {
+                    "name": f"REV-{index}-{review}",
+                    "item_code": code,
+                    "customer_name": f"Customer {review}",
+                    "rating": rng.randint(1, 5) / 5,
+                    "review": "Solid and well made.",
+                    "creation": modified,
+                }
+            )
+
+    for doctype, rows in (
+        ("Item", items),
+        ("Website Item", website_items),
+        ("Website Item Image", images),
+        ("Item Website Specification", specs),
+        ("Item Price", prices),
+        ("Bin", bins),
+        ("Item Review", reviews),
+    ):
+        db.insert_many(doctype, rows)
+
+    _build_customers(db, size, rng)
+    db.commit()
+
+
+def item_route(index):
+    return f"ep-{index:06d}-{ITEM_GROUPS[index % len(ITEM_GROUPS)].lower()}"
+
+
+def _build_customers(db, size, rng):
+    db.insert_many("User", [{"name": email, "email": email} for email in (RETAIL_USER, WHOLESALE_USER)])
+    db.insert_many(
+        "Customer",
+        [
+            {
+                "name": "Bench Retail",
+                "customer_name": "Bench Retail",
+                "customer_group": "Individual",
+                "email_id": RETAIL_USER,
+                "default_price_list": None,
+            },
+            {
+                "name": WHOLESALE_CUSTOMER,
+                "customer_name": WHOLESALE_CUSTOMER,
+                "customer_group": "Commercial",
+                "email_id": WHOLESALE_USER,
+                "default_price_list": WHOLESALE_PRICE_LIST,
+            },
+        ],
+    )
+
+    # The wholesale account's history grows with the catalog: 1k items -> 100 of each document
+    history = max(20, size // 10)
+    start = datetime.date(2020, 1, 1)
+    orders, invoices, payments = [], [], []
+    for index in range(history):
+        day = (start + datetime.timedelta(days=index % 2000)).isoformat()
+        total = round(rng.uniform(50, 5000), 2)
+        orders.append(
+            {
+                "name": f"SO-{index:06d}",
+                "customer": WHOLESALE_CUSTOMER,
+                "transaction_date": day,
+                "status": "Completed",
+                "grand_total": total,
+                "docstatus": 1,
+            }
+        )
+        outstanding = total if index % 7 == 0 else 0
+        invoices.append(
+            {
+                "name": f"SINV-{index:06d}",
+                "customer": WHOLESALE_CUSTOMER,
+                "posting_date": day,
+                "status": "Unpaid" if outstanding else "Paid",
+                "grand_total": total,
+                "outstanding_amount": outstanding,
+                "docstatus": 1,
+            }
+        )
+        payments.append(
+            {
+                "name": f"PE-{index:06d}",
+                "party_type": "Customer",
+                "party": WHOLESALE_CUSTOMER,
+                "posting_date": day,
+                "status": "Submitted",
+                "paid_amount": total - outstanding,
+                "paid_to_account_currency": "EUR",
+                "payment_type": "Receive",
+                "docstatus": 1,
+            }
+        )
+    db.insert_many("Sales Order", orders)
+    db.insert_many("Sales Invoice", invoices)
+    db.insert_many("Payment Entry", payments)
+
+
+def _child(name, parent, parentfield, **values):
+    row = {"name": name, "parent": parent, "parenttype": "Website Item", "parentfield": parentfield, "idx": 1}
+    return dict(row, **values)
+
+
+def _price(name, code, price_list, rate, customer=None):
+    return {
+        "name": name,
+        "item_code": code,
+        "price_list": price_list,
+        "price_list_rate": rate,
+        "uom": "Nos",
+        "customer": customer,
+        "valid_from": None,
+        "valid_upto": None,
+        "selling": 1,
+    }
@@ -0,0 +1,379 @@
+# Concurrent checkout load test against a running site.
+#
+#   python benchmarks/checkout_load.py --url http://localhost:8000 --orders 200 --concurrency 20 \
+#       --user buyer1@example.com:secret --user buyer2@example.com:secret --admin Administrator:admin
+#
+# Replays --orders synthetic checkouts through euro_website.api.place_order from
+# --concurrency threads. Guests reuse a small pool of emails so the same address
+# checks out from several threads at once, which is what races in
+# handlers._get_or_create_customer and _ensure_contact. Logged-in checkouts use
+# the --user accounts. Deadlocks and lock wait timeouts are recognised in the
+# error responses and retried with the same idempotency key.
+#
+# With --admin the run ends by counting the Customers, Contacts and Sales Orders
+# created for this run's guest emails. The process exits with status 1 when any
+# email ended up with more than one Customer or Contact.
+#
+# Only run this against a development site: every checkout creates real orders.
+import argparse
+import http.cookiejar
+import json
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+PLACE_ORDER = "/api/method/euro_website.api.place_order"
+GET_PRODUCTS = "/api/method/euro_website.api.get_products"
+# Records counted per guest email after the run
+RECORD_FIELDS = (("Customer", "email_id"), ("Contact", "email_id"), ("Sales Order", "contact_email"))
+
+# MariaDB 1213 / 1205 and the exception classes frappe maps them to
+DEADLOCK = re.compile(r"deadlock|QueryDeadlockError|\b1213\b", re.I)
+LOCK_WAIT = re.compile(r"lock wait timeout|QueryTimeoutError|\b1205\b", re.I)
+DUPLICATE = re.compile(r"duplicate entry|DuplicateEntryError|UniqueValidationError|\b1062\b", re.I)
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+COUNTRIES = ["Germany", "Austria", "Netherlands", "Belgium", "France", "Italy"]
+CITIES = ["Berlin", "Vienna", "Rotterdam", "Antwerp", "Lyon", "Milan"]
+
+
+class Client:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # One cookie jar per client keeps each buyer's session and guest cart apart
+        cookies = urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        self.opener = urllib.request.build_opener(cookies)
+
+    def login(self, user, password):
+        status, body, _ = self.post("/api/method/login", {"usr": user, "pwd": password})
+        if status != 200:
+            raise SystemExit(f"Login failed for {user}: {status} {_error_text(body)[:200]}")
+
+    def get(self, path, params=None):
+        url = f"{self.base_url}{path}"
+        if params:
+            url = f"{url}?{urllib.parse.urlencode(params)}"
+        return self._send(urllib.request.Request(url, headers={"Accept": "application/json"}))
+
+    def post(self, path, data):
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=urllib.parse.urlencode(data).encode(),
+            headers={"Accept": "application/json"},
+        )
+        return self._send(request)
+
+    def _send(self, request):
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return response.status, _parse(response.read()), response.headers
+        except urllib.error.HTTPError as exc:
+            return exc.code, _parse(exc.read()), exc.headers
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = []
+
+    def add(self, result):
+        with self.lock:
+            self.results.append(result)
+
+
+def _parse(raw):
+    try:
+        return json.loads(raw or b"{}")
+    except ValueError:
+        return {"exception": raw.decode(errors="replace")[:500]}
+
+
+def _error_text(body):
+    parts = [str(body.get(key) or "") for key in ("exc_type", "exception", "exc")]
+    for message in json.loads(body.get("_server_messages") or "[]"):
+        try:
+            parts.append(json.loads(message).get("message", ""))
+        except (ValueError, AttributeError):
+            parts.append(str(message))
+    return " ".join(part for part in parts if part)
+
+
+def _classify(text):
+    if DEADLOCK.search(text):
+        return "deadlock"
+    if LOCK_WAIT.search(text):
+        return "lock_wait"
+    if DUPLICATE.search(text):
+        return "duplicate_entry"
+    return "error"
+
+
+def fetch_item_codes(client, pages):
+    codes, cursor = [], None
+    for _ in range(pages):
+        params = {"page_size": 48}
+        if cursor:
+            params["cursor"] = cursor
+        status, body, _ = client.get(GET_PRODUCTS, params)
+        if status != 200:
+            raise SystemExit(f"get_products failed: {status} {_error_text(body)[:200]}")
+        page = body.get("message") or {}
+        codes.extend(item["item_code"] for item in page.get("items", []) if item.get("in_stock") is not False)
+        cursor = page.get("next_cursor")
+        if not cursor:
+            break
+    if not codes:
+        raise SystemExit("No published items with stock to order")
+    return codes
+
+
+def build_checkouts(args, item_codes, rng):
+    checkouts = []
+    for index in range(args.orders):
+        if args.user and rng.random() >= args.guest_ratio:
+            user = rng.choice(args.user)
+            email = user[0]
+        else:
+            user = None
+            email = f"loadtest+{args.run_id}-{rng.randrange(args.emails)}@example.com"
+        most = min(args.max_lines, len(item_codes))
+        lines = rng.randint(min(args.min_lines, most), most)
+        items = [{"item_code": code, "qty": rng.randint(1, 5)} for code in rng.sample(item_codes, lines)]
+        city = rng.randrange(len(CITIES))
+        checkouts.append(
+            {
+                "index": index,
+                "user": user,
+                "form": {
+                    "full_name": f"Load Test {email.split('@')[0]}",
+                    "email": email,
+                    "phone": f"+49 30 {rng.randint(1000000, 9999999)}",
+                    "address_line1": f"Teststrasse {rng.randint(1, 200)}",
+                    "city": CITIES[city],
+                    "country": COUNTRIES[city],
+                    "items": json.dumps(items),
+                    "notes": f"load test {args.run_id}",
+                    "payment_method": "Cash",
+                    "idempotency_key": uuid.uuid4().hex,
+                },
+            }
+        )
+    return checkouts
+
+
+def run_checkout(args, checkout, stats, gate=None):
+    client = Client(args.url, args.timeout)
+    try:
+        if checkout["user"]:
+            client.login(*checkout["user"])
+    except SystemExit:
+        if gate is not None:
+            gate.abort()
+        raise
+    if gate is not None:
+        try:
+            gate.wait(timeout=args.timeout)
+        except threading.BrokenBarrierError:
+            pass
+
+    started = time.perf_counter()
+    attempts, retried = 0, []
+    while True:
+        attempts += 1
+        status, body, headers = client.post(PLACE_ORDER, checkout["form"])
+        kind = None
+        text = ""
+        if status != 200:
+            text = _error_text(body)
+            kind = _classify(text)
+            if kind in ("deadlock", "lock_wait") and attempts <= args.retries:
+                retried.append(kind)
+                time.sleep(0.05 * attempts)
+                continue
+        break
+
+    message = body.get("message") if status == 200 else None
+    warning = (message or {}).get("warning") or ""
+    timing = SERVER_TIMING_DB.search(headers.get("Server-Timing") or "") if headers else None
+    stats.add(
+        {
+            "index": checkout["index"],
+            "guest": checkout["user"] is None,
+            "email": checkout["form"]["email"],
+            "lines": len(json.loads(checkout["form"]["items"])),
+            "ok": status == 200,
+            "status": status,
+            "error": kind,
+            "error_text": text[:300],
+            "attempts": attempts,
+            "retried": retried,
+            "submit_warning": _classify(warning) if warning else None,
+            "sales_order": (message or {}).get("sales_order"),
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "db_ms": float(timing.group(1)) if timing else None,
+            "queries": int(timing.group(2)) if timing else None,
+        }
+    )
+
+
+def count_records(client, run_id):
+    pattern = f"loadtest+{run_id}-%"
+    counts = {}
+    for doctype, field in RECORD_FIELDS:
+        status, body, _ = client.get(
+            f"/api/resource/{urllib.parse.quote(doctype)}",
+            {
+                "fields": json.dumps(["name", field]),
+                "filters": json.dumps([[field, "like", pattern]]),
+                "limit_page_length": 0,
+            },
+        )
+        if status != 200:
+            raise SystemExit(f"Reading {doctype} failed: {status} {_error_text(body)[:200]}")
+        per_email = {}
+        for row in body.get("data", []):
+            per_email[row[field]] = per_email.get(row[field], 0) + 1
+        counts[doctype] = per_email
+    return counts
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def report(args, results, elapsed, counts):
+    ok = [result for result in results if result["ok"]]
+    latencies = [result["latency_ms"] for result in ok]
+    retries = [kind for result in results for kind in result["retried"]]
+    errors = {}
+    for result in results:
+        if result["error"]:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+    warnings = {}
+    for result in ok:
+        if result["submit_warning"]:
+            warnings[result["submit_warning"]] = warnings.get(result["submit_warning"], 0) + 1
+
+    guests = sum(1 for result in results if result["guest"])
+    print(
+        f"\n{len(results)} checkouts ({guests} guest, {len(results) - guests} logged in) "
+        f"from {args.concurrency} threads in {elapsed:.1f}s"
+    )
+    print(f"succeeded           {len(ok)}")
+    print(f"throughput          {len(ok) / elapsed if elapsed else 0:.2f} orders/s")
+    if latencies:
+        print(
+            "latency ms          "
+            + "  ".join(f"p{int(q * 100)} {_percentile(latencies, q):.0f}" for q in (0.5, 0.9, 0.95, 0.99))
+            + f"  max {max(latencies):.0f}  mean {statistics.mean(latencies):.0f}"
+        )
+    db_times = [result["db_ms"] for result in ok if result["db_ms"] is not None]
+    if db_times:
+        queries = [result["queries"] for result in ok if result["queries"] is not None]
+        print(
+            f"server db ms        p50 {_percentile(db_times, 0.5):.0f}  p95 {_percentile(db_times, 0.95):.0f}"
+            f"  queries p50 {_percentile(queries, 0.5):.0f}"
+        )
+    for kind, label in (("deadlock", "deadlocks"), ("lock_wait", "lock wait timeouts")):
+        retried, failed = retries.count(kind), errors.get(kind, 0)
+        print(f"{label:<20}{retried + failed} ({retried} retried, {failed} failed)")
+    for kind in ("duplicate_entry", "error"):
+        if errors.get(kind):
+            print(f"{kind.replace('_', ' '):<20}{errors[kind]}")
+    if warnings:
+        counted = ", ".join(f"{kind} {count}" for kind, count in sorted(warnings.items()))
+        print(f"{'submit warnings':<20}{counted}")
+    for result in [result for result in results if result["error"] == "error"][:5]:
+        print(f"  {result['status']} {result['email']}: {result['error_text'][:150]}")
+
+    duplicates = {}
+    if counts is not None:
+        orders = sum(counts["Sales Order"].values())
+        expected = sum(1 for result in ok if result["guest"])
+        print(f"guest orders found  {orders} (expected {expected})")
+        for doctype in ("Customer", "Contact"):
+            duplicates[doctype] = {email: count for email, count in counts[doctype].items() if count > 1}
+            extra = sum(count - 1 for count in duplicates[doctype].values())
+            label = f"duplicate {doctype.lower()}s"
+            print(f"{label:<20}{extra} extra across {len(duplicates[doctype])} emails")
+    return duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay concurrent checkouts against a running site.")
+    parser.add_argument("--url", default="http://localhost:8000", help="site base url")
+    parser.add_argument("--orders", type=int, default=100, help="checkouts to place")
+    parser.add_argument("--concurrency", type=int, default=10, help="parallel checkouts")
+    parser.add_argument("--emails", type=int, help="guest email pool size (default: orders / 4)")
+    parser.add_argument("--guest-ratio", type=float, default=0.7, help="share of guest checkouts")
+    parser.add_argument("--user", action="append", default=[], help="logged-in buyer as email:password")
+    parser.add_argument("--admin", help="user:password allowed to read Customers, Contacts and Sales Orders")
+    parser.add_argument("--min-lines", type=int, default=1, help="fewest cart lines per order")
+    parser.add_argument("--max-lines", type=int, default=12, help="most cart lines per order")
+    parser.add_argument("--product-pages", type=int, default=3, help="store pages to draw items from")
+    parser.add_argument("--retries", type=int, default=2, help="retries after a deadlock or lock wait")
+    parser.add_argument("--timeout", type=float, default=60, help="request timeout in seconds")
+    parser.add_argument("--seed", type=int, help="random seed for a repeatable mix")
+    parser.add_argument("--run-id", help="tag for this run's guest emails (default: random)")
+    parser.add_argument("--json", help="also write per-checkout results to this file")
+    args = parser.parse_args()
+
+    args.user = [tuple(value.split(":", 1)) for value in args.user]
+    args.emails = max(1, args.emails or args.orders // 4)
+    args.run_id = args.run_id or uuid.uuid4().hex[:8]
+    rng = random.Random(args.seed)
+
+    item_codes = fetch_item_codes(Client(args.url, args.timeout), args.product_pages)
+    checkouts = build_checkouts(args, item_codes, rng)
+    print(
+        f"run {args.run_id}: {len(checkouts)} checkouts over {len(item_codes)} items, "
+        f"{args.emails} guest emails, {len(args.user)} accounts"
+    )
+
+    stats = Stats()
+    # The first wave logs in, then places its orders together; later checkouts start as threads free up
+    wave = min(args.concurrency, len(checkouts))
+    gate = threading.Barrier(wave)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(run_checkout, args, checkout, stats, gate if checkout["index"] < wave else None)
+            for checkout in checkouts
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    counts = None
+    if args.admin:
+        admin = Client(args.url, args.timeout)
+        admin.login(*args.admin.split(":", 1))
+        counts = count_records(admin, args.run_id)
+    duplicates = report(args, stats.results, elapsed, counts)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            summary = {"run_id": args.run_id, "elapsed": elapsed, "duplicates": duplicates}
+            json.dump(dict(summary, results=stats.results), f, indent=2)
+
+    if any(duplicates.values()):
+        print("\nDuplicate customers or contacts were created")
+        return 1
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,626 @@
+# A SQLite-backed stand-in for the slice of Frappe this app calls, so the
+# pages and API methods can be timed offline. Every query goes through
+# Database.sql, which is where queries and rows are counted.
+import datetime
+import pickle
+import random
+import re
+import sqlite3
+import string
+import sys
+import time
+import types
+import urllib.parse
+
+
+class _dict(dict):
+    def __getattr__(self, key):
+        return self.get(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        self.pop(key, None)
+
+    def copy(self):
+        return _dict(self)
+
+
+class ValidationError(Exception):
+    http_status_code = 417
+
+
+class DoesNotExistError(ValidationError):
+    http_status_code = 404
+
+
+class PermissionError(Exception):
+    http_status_code = 403
+
+
+class Redirect(Exception):
+    http_status_code = 301
+
+
+class QueryLog:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.cache_calls = 0
+
+
+class Database:
+    def __init__(self, log, path=":memory:"):
+        self.log = log
+        self.conn = sqlite3.connect(path)
+        self.meta = {}
+        self.singles = {}
+        self.create_table("DefaultValue", {"parent": "text", "defkey": "text", "defvalue": "text"})
+
+    def create_table(self, doctype, fields, indexes=()):
+        # fields: fieldname -> SQL type, or "Table:<child doctype>" for child tables
+        columns = {
+            "name": "text primary key",
+            "creation": "text",
+            "modified": "text",
+            "owner": "text",
+            "docstatus": "integer default 0",
+            "idx": "integer default 0",
+            "parent": "text",
+            "parenttype": "text",
+            "parentfield": "text",
+        }
+        meta_fields = []
+        for fieldname, kind in fields.items():
+            if kind.startswith("Table:"):
+                options = kind[len("Table:"):]
+                meta_fields.append(_dict(fieldname=fieldname, fieldtype="Table", options=options))
+                continue
+            columns[fieldname] = kind
+            meta_fields.append(_dict(fieldname=fieldname, fieldtype="Data", options=None))
+        self.meta[doctype] = meta_fields
+
+        body = ", ".join(f"`{column}` {kind}" for column, kind in columns.items())
+        self.conn.execute(f"create table `tab{doctype}` ({body})")
+        for index in ("parent",) + tuple(indexes):
+            columns_sql = ", ".join(f"`{column}`" for column in index.split(","))
+            slug = re.sub(r"\W", "_", f"{doctype}_{index}")
+            self.conn.execute(f"create index `idx_{slug}` on `tab{doctype}` ({columns_sql})")
+
+    def insert_many(self, doctype, rows):
+        if not rows:
+            return
+        columns = list(rows[0])
+        placeholders = ", ".join("?" for _ in columns)
+        names = ", ".join(f"`{column}`" for column in columns)
+        self.conn.executemany(
+            f"insert into `tab{doctype}` ({names}) values ({placeholders})",
+            [tuple(_to_sql(row[column]) for column in columns) for row in rows],
+        )
+
+    def sql(self, query, values=None, as_dict=False, pluck=False):
+        query, params = _translate(query, values)
+        started = time.perf_counter()
+        cursor = self.conn.execute(query, params)
+        rows = cursor.fetchall()
+        self.log.db_time += time.perf_counter() - started
+        self.log.queries += 1
+        self.log.rows += len(rows)
+
+        if pluck:
+            return [row[0] for row in rows]
+        if as_dict:
+            keys = [column[0] for column in cursor.description]
+            return [_dict(zip(keys, row)) for row in rows]
+        return [tuple(row) for row in rows]
+
+    def get_all(
+        self,
+        doctype,
+        filters=None,
+        fields=None,
+        order_by="modified desc",
+        limit_start=0,
+        limit_page_length=None,
+        pluck=None,
+        limit=None,
+        **kwargs,
+    ):
+        if pluck:
+            fields = [pluck]
+        fields = fields or ["name"]
+        conditions, values = _build_filters(doctype, filters)
+        query = f"select {', '.join(_quote_field(field) for field in fields)} from `tab{doctype}`"
+        if conditions:
+            query += " where " + " and ".join(conditions)
+        if order_by:
+            query += f" order by {order_by}"
+        limit = limit or limit_page_length
+        if limit:
+            query += f" limit {int(limit)} offset {int(limit_start or 0)}"
+        rows = self.sql(query, values, as_dict=True)
+        if pluck:
+            return [row[pluck] for row in rows]
+        return rows
+
+    def get_value(self, doctype, filters=None, fieldname="name", as_dict=False):
+        if doctype not in self.meta:
+            return self.get_single_value(doctype, fieldname)
+        fields = [fieldname] if isinstance(fieldname, str) else list(fieldname)
+        if isinstance(filters, str):
+            filters = {"name": filters}
+        rows = self.get_all(doctype, filters=filters, fields=fields, order_by=None, limit_page_length=1)
+        if not rows:
+            return None
+        if as_dict:
+            return rows[0]
+        return rows[0][fields[0]] if len(fields) == 1 else tuple(rows[0][field] for field in fields)
+
+    def get_single_value(self, doctype, fieldname):
+        return self.singles.get(doctype, {}).get(fieldname)
+
+    def exists(self, doctype, filters=None):
+        if doctype == "DocType":
+            return filters if self.table_exists(filters) else None
+        if doctype not in self.meta:
+            return None
+        if isinstance(filters, str):
+            filters = {"name": filters}
+        return self.get_value(doctype, filters, "name")
+
+    def table_exists(self, doctype):
+        return doctype in self.meta
+
+    def get_default(self, key, parent="__default"):
+        return self.get_value("DefaultValue", {"parent": parent, "defkey": key}, "defvalue")
+
+    def set_default(self, key, value, parent="__default", parenttype=None):
+        self.sql(
+            "delete from `tabDefaultValue` where parent = %(parent)s and defkey = %(key)s",
+            {"parent": parent, "key": key},
+        )
+        self.sql(
+            "insert into `tabDefaultValue` (name, parent, defkey, defvalue)"
+            " values (%(name)s, %(parent)s, %(key)s, %(value)s)",
+            {"name": generate_hash(), "parent": parent, "key": key, "value": value},
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+
+class FakeRedis:
+    # Values stored through the frappe-level helpers are pickled like RedisWrapper does,
+    # so raw hmget/pipeline callers see the same bytes they would on a real server
+    def __init__(self, log, prefix="bench"):
+        self.log = log
+        self.prefix = prefix
+        self.data = {}
+        self.expiry = {}
+
+    def flushall(self):
+        self.data.clear()
+        self.expiry.clear()
+
+    def make_key(self, key):
+        return f"{self.prefix}|{key}"
+
+    # frappe.cache() API
+    def get_value(self, key):
+        value = self.get(self.make_key(key))
+        return pickle.loads(value) if value is not None else None
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.set(self.make_key(key), pickle.dumps(value), ex=expires_in_sec)
+
+    def delete_value(self, keys):
+        for key in [keys] if isinstance(keys, str) else keys:
+            self.delete(self.make_key(key))
+
+    def delete_keys(self, prefix):
+        self.log.cache_calls += 1
+        full = self.make_key(prefix)
+        for key in [key for key in self.data if key.startswith(full)]:
+            self._drop(key)
+
+    def hget(self, name, key):
+        value = self.hmget(self.make_key(name), [key])[0]
+        return pickle.loads(value) if value is not None else None
+
+    def hset(self, name, key, value):
+        self._hash(self.make_key(name), create=True)[key] = pickle.dumps(value)
+        self.log.cache_calls += 1
+
+    def hdel(self, name, key):
+        self.log.cache_calls += 1
+        self._hash(self.make_key(name)).pop(key, None)
+
+    def hgetall(self, name):
+        self.log.cache_calls += 1
+        return {key.encode(): pickle.loads(value) for key, value in self._hash(self.make_key(name)).items()}
+
+    # redis-py API
+    def get(self, key):
+        self.log.cache_calls += 1
+        self._expire(key)
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        self.log.cache_calls += 1
+        self._expire(key)
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        self.expiry.pop(key, None)
+        if ex:
+            self.expiry[key] = time.time() + ex
+        return True
+
+    def delete(self, key):
+        self.log.cache_calls += 1
+        self._drop(key)
+
+    def hmget(self, key, fields):
+        self.log.cache_calls += 1
+        values = self._hash(key)
+        return [values.get(field) for field in fields]
+
+    def hlen(self, key):
+        self.log.cache_calls += 1
+        return len(self._hash(key))
+
+    def incr(self, key, amount=1):
+        self.log.cache_calls += 1
+        self._expire(key)
+        self.data[key] = str(int(self.data.get(key) or 0) + amount).encode()
+        return int(self.data[key])
+
+    def expire(self, key, seconds):
+        self.log.cache_calls += 1
+        if key in self.data:
+            self._set_expiry(key, seconds)
+
+    def rpush(self, key, *values):
+        self.log.cache_calls += 1
+        self._expire(key)
+        items = self.data.setdefault(key, [])
+        items.extend(_to_bytes(value) for value in values)
+        return len(items)
+
+    def ltrim(self, key, start, end):
+        self.log.cache_calls += 1
+        if key in self.data:
+            self.data[key] = self.lrange(key, start, end)
+
+    def lrange(self, key, start, end):
+        self.log.cache_calls += 1
+        self._expire(key)
+        items = self.data.get(key) or []
+        start = max(len(items) + start, 0) if start < 0 else start
+        end = len(items) + end if end < 0 else end
+        return items[start : end + 1]
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    def _raw_hset(self, key, field, value):
+        self._hash(key, create=True)[field] = value
+
+    def _raw_hgetall(self, key):
+        return {field.encode(): _to_bytes(value) for field, value in self._hash(key).items()}
+
+    def _hincrby(self, key, field, amount):
+        values = self._hash(key, create=True)
+        values[field] = int(values.get(field, 0)) + amount
+        return values[field]
+
+    def _hincrbyfloat(self, key, field, amount):
+        values = self._hash(key, create=True)
+        values[field] = float(values.get(field, 0)) + amount
+        return values[field]
+
+    def _set_expiry(self, key, seconds):
+        self.expiry[key] = time.time() + seconds
+
+    def _hash(self, key, create=False):
+        self._expire(key)
+        if create:
+            return self.data.setdefault(key, {})
+        return self.data.get(key) or {}
+
+    def _expire(self, key):
+        deadline = self.expiry.get(key)
+        if deadline and deadline < time.time():
+            self._drop(key)
+
+    def _drop(self, key):
+        self.data.pop(key, None)
+        self.expiry.pop(key, None)
+
+
+class Pipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def hset(self, key, field, value):
+        self.calls.append(lambda: self.redis._raw_hset(key, field, value))
+
+    def hgetall(self, key):
+        self.calls.append(lambda: self.redis._raw_hgetall(key))
+
+    def hincrby(self, key, field, amount=1):
+        self.calls.append(lambda: self.redis._hincrby(key, field, amount))
+
+    def hincrbyfloat(self, key, field, amount=1.0):
+        self.calls.append(lambda: self.redis._hincrbyfloat(key, field, amount))
+
+    def expire(self, key, seconds):
+        self.calls.append(lambda: self.redis._set_expiry(key, seconds))
+
+    def execute(self):
+        # One round trip, however many commands were queued
+        self.redis.log.cache_calls += 1
+        results = [call() for call in self.calls]
+        self.calls = []
+        return results
+
+
+class CookieManager:
+    def __init__(self):
+        self.cookies = {}
+
+    def set_cookie(self, key, value, expires=None, secure=False, httponly=False, samesite="Lax"):
+        self.cookies[key] = value
+
+
+class Request:
+    def __init__(self, path="/", method="GET", cookies=None):
+        self.path = path
+        self.method = method
+        self.cookies = cookies or {}
+        self.if_none_match = ()
+
+
+class TemplatePage:
+    def __init__(self, path=None, http_status_code=None):
+        self.path = path
+        self.http_status_code = http_status_code
+
+    def can_render(self):
+        return True
+
+
+class Response:
+    def __init__(self, response=None, status=200, content_type=None, mimetype=None):
+        self.response = response
+        self.status_code = status
+        self.content_type = content_type or mimetype
+        self.headers = {}
+
+
+def generate_hash(txt=None, length=10):
+    return "".join(random.choices(string.ascii_lowercase + string.digits, k=length))
+
+
+def install(site="bench.local", path=":memory:"):
+    """Register the stand-in as `frappe` and return it; call before importing euro_website."""
+    log = QueryLog()
+    module = types.ModuleType("frappe")
+    local = types.SimpleNamespace()
+    state = {"db": Database(log, path), "cache": FakeRedis(log), "log": log, "local": local, "site": site}
+
+    def new_request(path="/", user="Guest", form_dict=None, roles=(), cookies=None, conf=None):
+        for key in list(vars(local)):
+            delattr(local, key)
+        local.site = site
+        local.db = state["db"]
+        local.conf = _dict(conf or {})
+        local.form_dict = _dict(form_dict or {})
+        local.session = _dict(user=user, sid=generate_hash())
+        local.flags = _dict()
+        local.response = _dict()
+        local.request = Request(path, cookies=cookies)
+        local.cookie_manager = CookieManager()
+        local.roles = set(roles)
+        return local
+
+    def throw(message, exc=ValidationError, title=None):
+        raise exc(message)
+
+    def whitelist(allow_guest=False, xss_safe=False, methods=None):
+        return lambda fn: fn
+
+    def only_for(roles):
+        roles = {roles} if isinstance(roles, str) else set(roles)
+        if not roles & local.roles:
+            raise PermissionError("Not permitted")
+
+    def get_meta(doctype):
+        fields = state["db"].meta[doctype]
+        def get_field(name):
+            return next((f for f in fields if f.fieldname == name), None)
+
+        return _dict(fields=fields, get_field=get_field)
+
+    def get_doc(*args, **kwargs):
+        raise NotImplementedError("The benchmark stand-in is read-only; get_doc is not available")
+
+    def __getattr__(name):
+        # Frappe proxies these to the current request's locals
+        if name in ("db", "session", "form_dict", "flags", "request", "conf", "response"):
+            return getattr(local, name)
+        raise AttributeError(name)
+
+    utils = types.ModuleType("frappe.utils")
+    utils.flt = lambda value, precision=None: (
+        round(float(value or 0), precision) if precision else float(value or 0)
+    )
+    utils.cint = _cint
+    utils.now_datetime = datetime.datetime.now
+    utils.nowdate = lambda: datetime.date.today().isoformat()
+    utils.getdate = lambda value=None: _getdate(value)
+    utils.get_datetime = lambda value=None: (
+        datetime.datetime.fromisoformat(str(value)) if value else datetime.datetime.now()
+    )
+    utils.add_days = lambda value, days: value + datetime.timedelta(days=days)
+    utils.urlencode = urllib.parse.urlencode
+    utils.fmt_money = lambda amount, precision=2, currency=None: f"{float(amount or 0):,.{precision}f}"
+    utils.formatdate = lambda value=None, format_string=None: str(value or "")
+    utils.strip_html = lambda text: re.sub(r"<[^>]*>", "", text or "")
+
+    defaults = types.ModuleType("frappe.defaults")
+    defaults.get_global_default = lambda key: local.conf.get(key)
+
+    def clear_default(key=None, value=None, parent=None, name=None, parenttype=None):
+        state["db"].sql(
+            "delete from `tabDefaultValue` where parent = %(parent)s and defkey = %(key)s",
+            {"parent": parent, "key": key},
+        )
+
+    defaults.clear_default = clear_default
+
+    module.__dict__.update(
+        _dict=_dict,
+        local=local,
+        utils=utils,
+        defaults=defaults,
+        ValidationError=ValidationError,
+        DoesNotExistError=DoesNotExistError,
+        PermissionError=PermissionError,
+        Redirect=Redirect,
+        cache=lambda: state["cache"],
+        get_all=lambda *args, **kwargs: local.db.get_all(*args, **kwargs),
+        get_list=lambda *args, **kwargs: local.db.get_all(*args, **kwargs),
+        get_meta=get_meta,
+        get_doc=get_doc,
+        throw=throw,
+        whitelist=whitelist,
+        only_for=only_for,
+        generate_hash=generate_hash,
+        enqueue=lambda *args, **kwargs: None,
+        log_error=lambda *args, **kwargs: None,
+        add_tag=lambda *args, **kwargs: None,
+        new_request=new_request,
+        bench_state=state,
+        __getattr__=__getattr__,
+    )
+
+    website = types.ModuleType("frappe.website")
+    renderers = types.ModuleType("frappe.website.page_renderers")
+    template_page = types.ModuleType("frappe.website.page_renderers.template_page")
+    template_page.TemplatePage = TemplatePage
+    sys.modules.update(
+        {
+            "frappe": module,
+            "frappe.utils": utils,
+            "frappe.defaults": defaults,
+            "frappe.website": website,
+            "frappe.website.page_renderers": renderers,
+            "frappe.website.page_renderers.template_page": template_page,
+        }
+    )
+
+    try:
+        import werkzeug.wrappers  # noqa: F401
+    except ImportError:
+        # Benches always ship werkzeug; offline runs only need its Response type
+        wrappers = types.ModuleType("werkzeug.wrappers")
+        wrappers.Response = Response
+        sys.modules["werkzeug"] = types.ModuleType("werkzeug")
+        sys.modules["werkzeug.wrappers"] = wrappers
+
+    new_request()
+    return module
+
+
+def _translate(query, values):
+    # MariaDB-style %(name)s placeholders to SQLite named parameters; tuples expand for IN
+    if not values:
+        return query, {}
+    params = {}
+
+    def replace(match):
+        key = match.group(1)
+        value = values[key]
+        if isinstance(value, (tuple, list)):
+            names = []
+            for index, item in enumerate(value):
+                params[f"{key}__{index}"] = _to_sql(item)
+                names.append(f":{key}__{index}")
+            return f"({', '.join(names)})" if names else "(null)"
+        params[key] = _to_sql(value)
+        return f":{key}"
+
+    return re.sub(r"%\((\w+)\)s", replace, query), params
+
+
+def _build_filters(doctype, filters):
+    conditions = []
+    values = {}
+    if not filters:
+        return conditions, values
+
+    if isinstance(filters, dict):
+        filters = [
+            [doctype, field, *(value if isinstance(value, (list, tuple)) else ["=", value])]
+            for field, value in filters.items()
+        ]
+
+    for index, (filter_doctype, field, operator, value) in enumerate(filters):
+        key = f"f{index}"
+        operator = operator.lower()
+        if operator in ("in", "not in"):
+            values[key] = tuple(value)
+            clause = f"`{field}` {operator} %({key})s"
+        else:
+            values[key] = value
+            clause = f"`{field}` {operator} %({key})s"
+        if filter_doctype != doctype:
+            # Child table filter: match parents that have such a row
+            clause = f"name in (select parent from `tab{filter_doctype}` where {clause})"
+        conditions.append(clause)
+    return conditions, values
+
+
+def _quote_field(field):
+    if re.fullmatch(r"\w+", field):
+        return f"`{field}`"
+    return field
+
+
+def _to_sql(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value.isoformat()
+    return value
+
+
+def _to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+def _cint(value):
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _getdate(value=None):
+    if not value:
+        return datetime.date.today()
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
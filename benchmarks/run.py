@@ -0,0 +1,215 @@
+# Offline benchmark and query-budget check for the website pages and API.
+#
+#   python benchmarks/run.py                      # 1k, 10k and 100k item catalogs
+#   python benchmarks/run.py --sizes 1000 --runs 3 --only store
+#
+# Each scenario runs once against empty caches ("cold") and then --runs times
+# with caches filled ("warm"). The process exits with status 1 when any run
+# issues more queries than the scenario's budget. Budgets are per request and
+# must not grow with the catalog, which is what catches N+1 regressions.
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog  # noqa: E402
+import fake_frappe  # noqa: E402
+
+
+class Scenario:
+    def __init__(self, name, run, cold_budget, warm_budget):
+        self.name = name
+        self.run = run
+        self.cold_budget = cold_budget
+        self.warm_budget = warm_budget
+
+
+def _page(module_name, path, user="Guest", form_dict=None):
+    def run(frappe):
+        import importlib
+
+        frappe.new_request(path, user=user, form_dict=form_dict, conf=CONF)
+        importlib.import_module(module_name).get_context(frappe._dict())
+
+    return run
+
+
+def _api(method, path_user="Guest", roles=(), form_dict=None, **kwargs):
+    def run(frappe):
+        from euro_website import api
+
+        path = f"/api/method/euro_website.api.{method}"
+        frappe.new_request(path, user=path_user, form_dict=form_dict, roles=roles, conf=CONF)
+        getattr(api, method)(**kwargs)
+
+    return run
+
+
+def _prepare_checkout(frappe):
+    from euro_website.checkout import prepare_order_items
+
+    frappe.new_request("/api/method/euro_website.api.place_order", user=catalog.RETAIL_USER, conf=CONF)
+    items = [{"item_code": f"EP-{index:06d}", "qty": 2, "rate": 1} for index in range(0, 200, 10)]
+    prepare_order_items(items, catalog.COMPANY, catalog.PRICE_LIST, customer="Bench Retail")
+
+
+CONF = {"company": catalog.COMPANY, "currency": "EUR"}
+CART = json.dumps([{"item_code": f"EP-{index:06d}", "qty": index % 3 + 1} for index in range(0, 120, 6)])
+STOCK_CODES = json.dumps([f"EP-{index:06d}" for index in range(24)])
+
+SCENARIOS = [
+    Scenario("home", _page("euro_website.www.index", "/"), cold_budget=8, warm_budget=1),
+    Scenario("store", _page("euro_website.www.store.index", "/store"), cold_budget=12, warm_budget=2),
+    Scenario(
+        "store:category",
+        _page("euro_website.www.store.index", "/store", form_dict={"category": "Jars"}),
+        cold_budget=12,
+        warm_budget=2,
+    ),
+    Scenario(
+        "store:search",
+        _page("euro_website.www.store.index", "/store", form_dict={"q": "stackable jar"}),
+        cold_budget=14,
+        warm_budget=2,
+    ),
+    Scenario(
+        "store/<item>",
+        _page(
+            "euro_website.www.store.item",
+            f"/store/{catalog.item_route(42)}",
+            form_dict={"item": catalog.item_route(42)},
+        ),
+        cold_budget=12,
+        warm_budget=1,
+    ),
+    Scenario(
+        "portal",
+        _page("euro_website.www.portal.index", "/portal", user=catalog.WHOLESALE_USER),
+        cold_budget=8,
+        warm_budget=3,
+    ),
+    Scenario(
+        "api:get_products",
+        _api("get_products", form_dict={"page": 2, "category": "Cups"}),
+        cold_budget=12,
+        warm_budget=2,
+    ),
+    Scenario(
+        "api:sync_cart",
+        _api("sync_cart", path_user=catalog.RETAIL_USER, changes=CART, replace=1),
+        cold_budget=14,
+        warm_budget=4,
+    ),
+    Scenario("api:get_stock", _api("get_stock", item_codes=STOCK_CODES), cold_budget=6, warm_budget=0),
+    Scenario(
+        "api:get_portal_orders",
+        _api("get_portal_orders", path_user=catalog.WHOLESALE_USER, status="Completed"),
+        cold_budget=4,
+        warm_budget=1,
+    ),
+    Scenario("checkout:prepare", _prepare_checkout, cold_budget=10, warm_budget=1),
+]
+
+
+def reset_caches(frappe):
+    frappe.bench_state["cache"].flushall()
+    # Per-process caches are module-level dicts named _<something>; drop them too
+    for name, module in list(sys.modules.items()):
+        if not name.startswith("euro_website") or module is None:
+            continue
+        for attr, value in vars(module).items():
+            if attr.startswith("_") and not attr.startswith("__") and type(value) is dict:
+                value.clear()
+
+
+def measure(frappe, scenario):
+    log = frappe.bench_state["log"]
+    log.reset()
+    started = time.perf_counter()
+    scenario.run(frappe)
+    elapsed = (time.perf_counter() - started) * 1000
+    return {
+        "ms": elapsed,
+        "queries": log.queries,
+        "rows": log.rows,
+        "db_ms": log.db_time * 1000,
+        "cache": log.cache_calls,
+    }
+
+
+def run_size(size, runs, only):
+    frappe = fake_frappe.install()
+    started = time.perf_counter()
+    catalog.build_catalog(frappe.bench_state["db"], size)
+    print(f"\n== {size:,} items (catalog built in {time.perf_counter() - started:.1f}s)")
+    print(
+        f"{'scenario':<24}{'cold ms':>10}{'cold q':>8}{'cold rows':>11}"
+        f"{'warm ms':>10}{'warm q':>8}{'warm rows':>11}{'redis':>7}  budget"
+    )
+
+    results = []
+    for scenario in SCENARIOS:
+        if only and not any(scenario.name.startswith(prefix) for prefix in only):
+            continue
+        reset_caches(frappe)
+        cold = measure(frappe, scenario)
+        warm_runs = [measure(frappe, scenario) for _ in range(runs)]
+        warm = {
+            "ms": statistics.median(run["ms"] for run in warm_runs),
+            "queries": max(run["queries"] for run in warm_runs),
+            "rows": max(run["rows"] for run in warm_runs),
+            "cache": max(run["cache"] for run in warm_runs),
+        }
+        over = []
+        if cold["queries"] > scenario.cold_budget:
+            over.append(f"cold {cold['queries']} > {scenario.cold_budget}")
+        if warm["queries"] > scenario.warm_budget:
+            over.append(f"warm {warm['queries']} > {scenario.warm_budget}")
+        print(
+            f"{scenario.name:<24}{cold['ms']:>10.1f}{cold['queries']:>8}{cold['rows']:>11}"
+            f"{warm['ms']:>10.1f}{warm['queries']:>8}{warm['rows']:>11}{warm['cache']:>7}  "
+            + ("OVER: " + ", ".join(over) if over else "ok")
+        )
+        results.append(
+            {"size": size, "scenario": scenario.name, "cold": cold, "warm": warm, "over_budget": over}
+        )
+
+    for name in [name for name in sys.modules if name == "euro_website" or name.startswith("euro_website.")]:
+        del sys.modules[name]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark euro_website pages and API against a SQLite stand-in."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="catalog sizes to build"
+    )
+    parser.add_argument("--runs", type=int, default=5, help="warm runs per scenario")
+    parser.add_argument("--only", nargs="*", help="run scenarios whose name starts with one of these")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.runs, args.only))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failures = [result for result in results if result["over_budget"]]
+    if failures:
+        print(f"\n{len(failures)} scenario run(s) exceeded their query budget")
+        return 1
+    print("\nAll scenarios within their query budgets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
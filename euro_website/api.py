@@ -1,5 +1,28 @@
 import json
 import frappe
+from werkzeug.wrappers import Response
+
+from euro_website.cart import apply_cart_changes, clear_cart, get_cart_lines, get_cart_view
+from euro_website.checkout import prepare_order_items, run_idempotent
+from euro_website.customer import get_customer, get_customer_info
+from euro_website.instrumentation import get_route_stats, render_prometheus
+from euro_website.orders import (
+    async_orders_enabled,
+    get_status_owner,
+    queue_web_order,
+    read_order_status,
+    set_order_status,
+)
+from euro_website.portal import format_portal_rows, get_portal_page
+from euro_website.stock import get_stock_availability
+from euro_website.warehouse import get_default_company
+
+
+@frappe.whitelist()
+def get_metrics():
+    frappe.only_for("System Manager")
+    # Prometheus text exposition format
+    return Response(render_prometheus(get_route_stats()), content_type="text/plain; version=0.0.4")
 
 
 @frappe.whitelist(allow_guest=True)
@@ -41,13 +64,53 @@ def update_cart(item_code: str, qty: int = 1):
     return updater(item_code=item_code, qty=qty)
 
 
+@frappe.whitelist(allow_guest=True)
+def get_cart():
+    return get_cart_view(get_cart_lines())
+
+
+@frappe.whitelist(allow_guest=True)
+def sync_cart(changes=None, replace: int = 0):
+    # changes: [{"item_code": ..., "qty": absolute qty, 0 removes}] batched by the client
+    if isinstance(changes, str):
+        changes = json.loads(changes)
+    lines = apply_cart_changes(changes, replace=bool(int(replace or 0)))
+    return get_cart_view(lines)
+
+
+@frappe.whitelist(allow_guest=True)
+def get_stock(item_codes):
+    if isinstance(item_codes, str):
+        item_codes = json.loads(item_codes)
+    if len(item_codes or []) > 200:
+        frappe.throw("Too many items")
+    availability = get_stock_availability(item_codes)
+    # Warehouse names stay internal
+    return {code: {"qty": entry["qty"], "in_stock": entry["in_stock"]} for code, entry in availability.items()}
+
+
+@frappe.whitelist(allow_guest=True)
+def get_products(
+    q: str = None,
+    category: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    page_size: int = 24,
+    cursor: str = None,
+):
+    from euro_website.www.store.index import get_product_page
+
+    # Filters are read from form_dict by the store page helpers
+    return get_product_page()
+
+
 @frappe.whitelist(allow_guest=True)
 def get_checkout_profile():
     user = frappe.session.user
     if not user or user == "Guest":
         return {}
 
-    customer = _get_customer_for_user(user)
+    customer = get_customer(user)
     contact = _get_contact_for_user(user)
     address = _get_primary_address(customer)
 
@@ -95,12 +158,39 @@ def update_profile(full_name: str, email: str, phone: str = ""):
     return {"ok": True}
 
 
+@frappe.whitelist()
+def get_portal_orders(status: str = None, cursor: str = None, page_length: int = 20):
+    return _get_portal_list("orders", status, cursor, page_length)
+
+
+@frappe.whitelist()
+def get_portal_invoices(status: str = None, cursor: str = None, page_length: int = 20):
+    return _get_portal_list("invoices", status, cursor, page_length)
+
+
+@frappe.whitelist()
+def get_portal_payments(status: str = None, cursor: str = None, page_length: int = 20):
+    return _get_portal_list("payments", status, cursor, page_length)
+
+
+def _get_portal_list(kind, status, cursor, page_length):
+    user = frappe.session.user
+    if not user or user == "Guest":
+        frappe.throw("Login required")
+    customer = get_customer(user)
+    if not customer:
+        return {"items": [], "next_cursor": None}
+    page = get_portal_page(kind, customer, status=status or None, cursor=cursor, page_length=page_length)
+    format_portal_rows(kind, page["items"])
+    return page
+
+
 @frappe.whitelist()
 def list_addresses():
     user = frappe.session.user
     if not user or user == "Guest":
         frappe.throw("Login required")
-    customer = _get_customer_for_user(user)
+    customer = get_customer(user)
     if not customer:
         return []
     addresses = frappe.get_all(
@@ -134,7 +224,7 @@ def save_address(
     user = frappe.session.user
     if not user or user == "Guest":
         frappe.throw("Login required")
-    customer = _get_customer_for_user(user)
+    customer = get_customer(user)
     if not customer:
         frappe.throw("Customer not found")
     if not address_title or not address_line1 or not city or not country:
@@ -199,25 +289,63 @@ def place_order(
     address_line1: str,
     city: str,
     country: str,
-    items,
+    items=None,
     notes: str = "",
     payment_method: str = "Cash",
     update_profile: int = 0,
     update_address: int = 0,
+    idempotency_key: str = None,
+):
+    return run_idempotent(
+        idempotency_key,
+        lambda: _place_order(
+            full_name,
+            email,
+            phone,
+            address_line1,
+            city,
+            country,
+            items,
+            notes=notes,
+            payment_method=payment_method,
+            update_profile=update_profile,
+            update_address=update_address,
+        ),
+    )
+
+
+def _place_order(
+    full_name,
+    email,
+    phone,
+    address_line1,
+    city,
+    country,
+    items=None,
+    notes="",
+    payment_method="Cash",
+    update_profile=0,
+    update_address=0,
 ):
     if not (full_name and email and address_line1 and city and country):
         frappe.throw("Missing required fields")
 
     if isinstance(items, str):
         items = json.loads(items)
+    if not items:
+        # Clients that keep their cart server-side send no items
+        items = [{"item_code": code, "qty": qty} for code, qty in get_cart_lines().items()]
     if not items:
         frappe.throw("Cart is empty")
 
-    from euro_website.handlers import _get_group_and_price, _get_or_create_customer, _ensure_contact
+    from euro_website.handlers import _get_group_and_price, _get_or_create_customer, _ensure_contact, resolve_identity
 
     customer_group, price_list, customer_type_value = _get_group_and_price("Retail")
-    customer = _get_or_create_customer(full_name, email, customer_type="Retail")
-    _ensure_contact(customer, full_name, email)
+    identity = resolve_identity(email)
+    customer = _get_or_create_customer(full_name, email, customer_type="Retail", identity=identity)
+    _ensure_contact(customer, full_name, email, identity=identity)
+    # Price the order from the same list the store and cart showed
+    customer_group, price_list = _get_customer_pricing(customer, customer_group)
 
     address_name = _create_or_update_address(
         full_name,
@@ -228,25 +356,10 @@ def place_order(
         update_address=bool(int(update_address)),
     )
 
-    company = frappe.defaults.get_global_default("company")
-    if not company:
-        company = frappe.get_all("Company", fields=["name"], limit_page_length=1)[0].name
-
-    so_items = []
-    for item in items:
-        if not item.get("item_code"):
-            continue
-        warehouse = _get_item_warehouse(item.get("item_code"), company)
-        so_items.append(
-            {
-                "item_code": item.get("item_code"),
-                "qty": item.get("qty") or 1,
-                "rate": item.get("rate") or 0,
-                "price_list_rate": item.get("rate") or 0,
-                "warehouse": warehouse,
-            }
-        )
+    company = get_default_company()
 
+    prepared = prepare_order_items(items, company, price_list, customer=customer)
+    so_items = prepared["items"]
     if not so_items:
         frappe.throw("Invalid cart items")
 
@@ -277,7 +390,31 @@ def place_order(
         }
     )
     so.flags.ignore_permissions = True
+    # Lets the before_insert hook skip looking the customer up again
+    so.flags.web_identity = identity
+
+    if async_orders_enabled():
+        # Submission, contact update and user provisioning run in a background job
+        so.flags.defer_web_user = True
+        so.insert()
+        profile = None
+        if frappe.session.user != "Guest" and bool(int(update_profile)):
+            profile = {"full_name": full_name, "email": email, "phone": phone}
+        queue_web_order(so.name, email=email, profile=profile)
+        clear_cart()
+        return {
+            "ok": True,
+            "sales_order": so.name,
+            "submitted": False,
+            "queued": True,
+            "warning": None,
+            "price_changes": prepared["price_changes"],
+            "removed_items": prepared["removed_items"],
+            "stock_issues": prepared["stock_issues"],
+        }
+
     so.insert()
+    clear_cart()
 
     submitted = False
     submit_error = None
@@ -287,6 +424,8 @@ def place_order(
         submitted = True
     except Exception as exc:
         submit_error = str(exc)
+    # Lets the order page poll get_order_status for this session
+    set_order_status(so.name, "submitted" if submitted else "draft", owner=get_status_owner(create=True))
 
     if frappe.session.user != "Guest" and bool(int(update_profile)):
         try:
@@ -299,9 +438,29 @@ def place_order(
         "sales_order": so.name,
         "submitted": submitted,
         "warning": submit_error,
+        "price_changes": prepared["price_changes"],
+        "removed_items": prepared["removed_items"],
+        "stock_issues": prepared["stock_issues"],
     }
 
 
+def _get_customer_pricing(customer, default_group):
+    # The session's price list is what the store and cart displayed; a guest typing a
+    # wholesale customer's email still pays the guest price
+    info = get_customer_info()
+    if info.customer == customer:
+        return info.customer_group or default_group, info.price_list
+    customer_group = frappe.db.get_value("Customer", customer, "customer_group") or default_group
+    return customer_group, info.price_list
+
+
+@frappe.whitelist(allow_guest=True)
+def get_order_status(sales_order: str):
+    if not sales_order:
+        frappe.throw("Missing sales_order")
+    return read_order_status(sales_order)
+
+
 def _create_address(full_name, address_line1, city, country, customer):
     address = frappe.get_doc(
         {
@@ -334,60 +493,6 @@ def _create_or_update_address(full_name, address_line1, city, country, customer,
     return _create_address(full_name, address_line1, city, country, customer)
 
 
-def _get_item_warehouse(item_code, company):
-    warehouse = _get_value_if_field("Item", item_code, "default_warehouse")
-    if warehouse:
-        if _warehouse_belongs_to_company(warehouse, company):
-            return warehouse
-
-    if frappe.db.exists("DocType", "Item Default"):
-        defaults = frappe.get_all(
-            "Item Default",
-            filters={"parent": item_code},
-            fields=["default_warehouse"],
-            limit_page_length=1,
-        )
-        if defaults and defaults[0].default_warehouse:
-            if _warehouse_belongs_to_company(defaults[0].default_warehouse, company):
-                return defaults[0].default_warehouse
-
-    if company:
-        warehouse = _get_value_if_field("Company", company, "default_warehouse")
-        if warehouse and _warehouse_belongs_to_company(warehouse, company):
-            return warehouse
-
-    stock_settings = frappe.get_single("Stock Settings")
-    warehouse = getattr(stock_settings, "default_warehouse", None) if stock_settings else None
-    if warehouse and _warehouse_belongs_to_company(warehouse, company):
-        return warehouse
-
-    fallback = frappe.get_all(
-        "Warehouse",
-        filters={"company": company} if company else None,
-        fields=["name"],
-        limit_page_length=1,
-    )
-    if fallback:
-        return fallback[0].name
-    fallback_any = frappe.get_all("Warehouse", fields=["name"], limit_page_length=1)
-    return fallback_any[0].name if fallback_any else None
-
-
-def _get_value_if_field(doctype, name, fieldname):
-    meta = frappe.get_meta(doctype)
-    fieldnames = [df.fieldname for df in meta.fields if df.fieldname]
-    if fieldname not in fieldnames:
-        return None
-    return frappe.db.get_value(doctype, name, fieldname)
-
-
-def _warehouse_belongs_to_company(warehouse, company):
-    if not warehouse or not company:
-        return True
-    wh_company = frappe.db.get_value("Warehouse", warehouse, "company")
-    return not wh_company or wh_company == company
-
-
 def _get_payment_terms(payment_method):
     if not payment_method:
         return None
@@ -398,29 +503,6 @@ def _get_payment_terms(payment_method):
     return None
 
 
-def _get_customer_for_user(user):
-    customer = frappe.get_all(
-        "Customer",
-        filters={"email_id": user},
-        fields=["name"],
-        limit_page_length=1,
-    )
-    if customer:
-        return customer[0].name
-
-    contact = _get_contact_for_user(user)
-    if contact:
-        link = frappe.get_all(
-            "Dynamic Link",
-            filters={"parent": contact.get("name"), "link_doctype": "Customer"},
-            fields=["link_name"],
-            limit_page_length=1,
-        )
-        if link:
-            return link[0].link_name
-    return None
-
-
 def _get_contact_for_user(user):
     contact = frappe.get_all(
         "Contact",
@@ -0,0 +1,23 @@
+import pickle
+
+import frappe
+
+
+def hget_many(name, keys):
+    keys = list(keys)
+    if not keys:
+        return {}
+    cache = frappe.cache()
+    values = cache.hmget(cache.make_key(name), keys)
+    return {key: pickle.loads(value) for key, value in zip(keys, values) if value is not None}
+
+
+def hset_many(name, mapping):
+    if not mapping:
+        return
+    cache = frappe.cache()
+    key = cache.make_key(name)
+    pipe = cache.pipeline()
+    for field, value in mapping.items():
+        pipe.hset(key, field, pickle.dumps(value))
+    pipe.execute()
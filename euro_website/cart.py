@@ -0,0 +1,137 @@
+import json
+
+import frappe
+
+from euro_website.customer import get_customer, get_price_list
+from euro_website.pricing import get_item_prices
+from euro_website.schema import get_available_fields
+from euro_website.stock import get_stock_availability
+
+CART_KEY = "euro_website:cart:{}"
+CART_TTL = 30 * 24 * 60 * 60
+# Logged-in carts are also kept as a per-user DefaultValue so they survive a Redis flush
+CART_DEFAULT = "euro_website_cart"
+CART_COOKIE = "euro_cart_id"
+MAX_CART_LINES = 100
+MAX_LINE_QTY = 999
+CART_ITEM_FIELDS = ["item_code", "item_name", "route", "thumbnail", "website_image", "standard_rate"]
+
+
+def get_cart_lines():
+    owner = _get_owner()
+    if not owner:
+        return {}
+
+    lines = frappe.cache().get_value(CART_KEY.format(owner))
+    if lines is None:
+        lines = {}
+        if _is_user():
+            stored = frappe.db.get_default(CART_DEFAULT, parent=frappe.session.user)
+            lines = json.loads(stored) if stored else {}
+        frappe.cache().set_value(CART_KEY.format(owner), lines, expires_in_sec=CART_TTL)
+    return lines
+
+
+def apply_cart_changes(changes, replace=False):
+    lines = {} if replace else dict(get_cart_lines())
+    for change in changes or []:
+        code = change.get("item_code")
+        if not code:
+            continue
+        qty = frappe.utils.cint(change.get("qty"))
+        if qty > 0:
+            lines[code] = min(qty, MAX_LINE_QTY)
+        else:
+            lines.pop(code, None)
+
+    if len(lines) > MAX_CART_LINES:
+        frappe.throw(f"A cart can hold at most {MAX_CART_LINES} different items")
+    _save_cart_lines(lines)
+    return lines
+
+
+def get_cart_view(lines):
+    codes = list(lines)
+    if not codes:
+        return {"items": [], "total": 0, "removed_items": []}
+
+    published = {
+        row.item_code: row
+        for row in frappe.get_all(
+            "Website Item",
+            filters={"item_code": ["in", codes], "published": 1},
+            fields=get_available_fields("Website Item", CART_ITEM_FIELDS),
+        )
+    }
+    prices = get_item_prices(codes, get_price_list(), customer=get_customer())
+    stock = get_stock_availability(codes)
+
+    items = []
+    removed_items = []
+    for code, qty in lines.items():
+        row = published.get(code)
+        if not row:
+            removed_items.append(code)
+            continue
+        rate = prices.get(code, frappe.utils.flt(row.get("standard_rate")))
+        items.append(
+            {
+                "item_code": code,
+                "item_name": row.item_name or code,
+                "route": row.get("route") or code,
+                "image": row.get("thumbnail") or row.get("website_image") or "",
+                "rate": rate,
+                "qty": qty,
+                "in_stock": stock[code]["in_stock"],
+                "available": stock[code]["qty"],
+            }
+        )
+
+    if removed_items:
+        _save_cart_lines({code: qty for code, qty in lines.items() if code not in removed_items})
+    return {
+        "items": items,
+        "total": sum(item["rate"] * item["qty"] for item in items),
+        "removed_items": removed_items,
+    }
+
+
+def clear_cart():
+    owner = _get_owner()
+    if not owner:
+        return
+    frappe.cache().delete_value(CART_KEY.format(owner))
+    if _is_user():
+        frappe.defaults.clear_default(CART_DEFAULT, parent=frappe.session.user)
+
+
+def _save_cart_lines(lines):
+    owner = _get_owner(create=True)
+    frappe.cache().set_value(CART_KEY.format(owner), lines, expires_in_sec=CART_TTL)
+    if _is_user():
+        frappe.db.set_default(CART_DEFAULT, json.dumps(lines), parent=frappe.session.user)
+
+
+def _get_owner(create=False):
+    if _is_user():
+        return frappe.session.user
+
+    # Guests share the "Guest" session id, so their carts are keyed by a cookie instead
+    cart_id = getattr(frappe.local, "euro_website_cart_id", None)
+    request = getattr(frappe.local, "request", None)
+    if not cart_id and request:
+        cart_id = request.cookies.get(CART_COOKIE)
+    if not cart_id and create:
+        cart_id = frappe.generate_hash(length=20)
+        frappe.local.cookie_manager.set_cookie(
+            CART_COOKIE,
+            cart_id,
+            expires=frappe.utils.add_days(frappe.utils.now_datetime(), 30),
+            httponly=True,
+        )
+    frappe.local.euro_website_cart_id = cart_id
+    return f"guest:{cart_id}" if cart_id else None
+
+
+def _is_user():
+    return bool(frappe.session.user) and frappe.session.user != "Guest"
@@ -0,0 +1,40 @@
+import frappe
+
+FACETS_KEY = "euro_website:category_facets"
+# Backstop for Item changes made without a save hook, e.g. bulk updates
+FACETS_CACHE_TTL = 10 * 60
+
+# Published Website Items whose Item is in the given group; shared by the
+# facet counts and the listing filter so both agree on membership
+CATEGORY_SUBQUERY = """
+    select item.name from `tabItem` item
+    where item.published_in_website = 1 and item.item_group = %(category)s
+"""
+
+
+def get_category_counts():
+    counts = frappe.cache().get_value(FACETS_KEY)
+    if counts is None:
+        rows = frappe.db.sql(
+            """
+            select item.item_group, count(*)
+            from `tabWebsite Item` website_item
+            inner join `tabItem` item on item.name = website_item.item_code
+            where website_item.published = 1
+                and item.published_in_website = 1
+                and coalesce(item.item_group, '') != ''
+            group by item.item_group
+            """
+        )
+        counts = {group: count for group, count in rows}
+        frappe.cache().set_value(FACETS_KEY, counts, expires_in_sec=FACETS_CACHE_TTL)
+    return counts
+
+
+def clear_category_cache(doc=None, method=None):
+    # Deleted after commit so a concurrent request cannot recount the old rows into the cache
+    frappe.db.after_commit.add(_delete_facets)
+
+
+def _delete_facets():
+    frappe.cache().delete_value(FACETS_KEY)
@@ -0,0 +1,120 @@
+import hashlib
+import pickle
+import time
+
+import frappe
+
+from euro_website.pricing import get_item_prices
+from euro_website.schema import has_field
+from euro_website.stock import get_stock_availability
+from euro_website.warehouse import get_item_warehouses
+
+IDEMPOTENCY_KEY = "euro_website:checkout:{}"
+IDEMPOTENCY_TTL = 24 * 60 * 60
+# How long a request may hold the key before a retry is allowed to take over
+IDEMPOTENCY_LOCK_TTL = 2 * 60
+IDEMPOTENCY_WAIT = 30
+_PENDING = b"pending"
+
+
+def prepare_order_items(items, company, price_list, customer=None):
+    lines = _merge_lines(items)
+    codes = list(lines)
+    if not codes:
+        return frappe._dict(items=[], price_changes=[], removed_items=[], stock_issues=[])
+
+    fields = ["item_code", "item_name"]
+    if has_field("Website Item", "standard_rate"):
+        fields.append("standard_rate")
+    published = {
+        row.item_code: row
+        for row in frappe.get_all(
+            "Website Item",
+            filters={"item_code": ["in", codes], "published": 1},
+            fields=fields,
+        )
+    }
+    prices = get_item_prices(codes, price_list, customer=customer)
+    warehouses = get_item_warehouses(codes, company)
+    stock = get_stock_availability(codes, company)
+
+    so_items = []
+    price_changes = []
+    removed_items = []
+    stock_issues = []
+    for code, line in lines.items():
+        if code not in published:
+            removed_items.append(code)
+            continue
+
+        row = {"item_code": code, "qty": line["qty"], "warehouse": warehouses.get(code)}
+        rate = prices.get(code)
+        if rate is None:
+            rate = frappe.utils.flt(published[code].get("standard_rate")) or None
+        if rate is not None:
+            # Let ERPNext fill the rate from the price list when we have none
+            row["rate"] = rate
+            row["price_list_rate"] = rate
+
+        client_rate = line["rate"]
+        if client_rate is not None and rate is not None and abs(client_rate - rate) >= 0.005:
+            price_changes.append({"item_code": code, "client_rate": client_rate, "rate": rate})
+        so_items.append(row)
+
+        # Reported, not enforced; backorders are still accepted
+        available = stock[code]["qty"]
+        if available is not None and line["qty"] > available:
+            stock_issues.append({"item_code": code, "qty": line["qty"], "available": max(0, available)})
+
+    return frappe._dict(
+        items=so_items, price_changes=price_changes, removed_items=removed_items, stock_issues=stock_issues
+    )
+
+
+def _merge_lines(items):
+    lines = {}
+    for item in items or []:
+        code = item.get("item_code")
+        if not code:
+            continue
+        qty = max(1, frappe.utils.cint(item.get("qty") or 1))
+        rate = item.get("rate")
+        line = lines.setdefault(code, {"qty": 0, "rate": None})
+        line["qty"] += qty
+        if rate not in (None, ""):
+            line["rate"] = frappe.utils.flt(rate)
+    return lines
+
+
+def run_idempotent(token, func):
+    if not token:
+        return func()
+    if len(token) > 64:
+        frappe.throw("Invalid idempotency key")
+
+    cache = frappe.cache()
+    scope = hashlib.sha1(f"{frappe.session.user}:{token}".encode()).hexdigest()
+    key = cache.make_key(IDEMPOTENCY_KEY.format(scope))
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT
+    while True:
+        if cache.set(key, _PENDING, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+            try:
+                result = func()
+            except Exception:
+                cache.delete(key)
+                raise
+            # Only a committed order may be replayed; a rolled-back one frees the key for a retry
+            stored = pickle.dumps(result)
+            frappe.db.after_commit.add(lambda: cache.set(key, stored, ex=IDEMPOTENCY_TTL))
+            frappe.db.after_rollback.add(lambda: cache.delete(key))
+            return result
+
+        value = cache.get(key)
+        if value is not None and value != _PENDING:
+            result = pickle.loads(value)
+            if isinstance(result, dict):
+                result = dict(result, replayed=True)
+            return result
+        if time.monotonic() > deadline:
+            frappe.throw("Your order is still being processed. Please wait a moment and check your portal.")
+        time.sleep(0.25)
@@ -0,0 +1,176 @@
+import frappe
+
+CUSTOMER_KEY = "euro_website:customer:{}"
+CUSTOMER_USERS_KEY = "euro_website:customer_users"
+PRICE_LISTS_KEY = "euro_website:price_lists"
+CUSTOMER_CACHE_TTL = 60 * 60
+
+DEFAULT_PRICE_LISTS = ("Website Price List", "Standard Selling")
+
+# Web customer type -> records it maps to. Sites can override entries with the
+# "euro_website_customer_types" key in site_config.json; install.bootstrap creates them.
+CUSTOMER_TYPES = {
+    "Retail": {"customer_group": "Individual", "price_list": "Website Price List", "customer_type": "Individual"},
+    "Wholesale": {"customer_group": "Commercial", "price_list": "Standard Selling", "customer_type": "Company"},
+}
+
+
+def get_customer_info(user=None):
+    user = user or frappe.session.user
+    if not user or user == "Guest":
+        return frappe._dict(customer=None, customer_name=None, customer_group=None, price_list=get_default_price_list())
+
+    memo = _get_request_memo()
+    if user in memo:
+        return memo[user]
+
+    cache = frappe.cache()
+    info = cache.get_value(CUSTOMER_KEY.format(user))
+    if info is None:
+        info = _resolve(user)
+        cache.set_value(CUSTOMER_KEY.format(user), info, expires_in_sec=CUSTOMER_CACHE_TTL)
+        if info.get("customer"):
+            _remember_user(info["customer"], user)
+
+    info = frappe._dict(info)
+    memo[user] = info
+    return info
+
+
+def get_customer(user=None):
+    return get_customer_info(user).customer
+
+
+def get_price_list(user=None):
+    return get_customer_info(user).price_list
+
+
+def get_default_price_list():
+    price_lists = _get_price_lists()
+    for name in DEFAULT_PRICE_LISTS:
+        if name in price_lists["all"]:
+            return name
+    return price_lists["selling"][0] if price_lists["selling"] else None
+
+
+def get_customer_types():
+    overrides = frappe.conf.get("euro_website_customer_types") or {}
+    return {
+        name: frappe._dict(CUSTOMER_TYPES.get(name, {}), **overrides.get(name, {}))
+        for name in dict(CUSTOMER_TYPES, **overrides)
+    }
+
+
+def get_customer_type(customer_type):
+    customer_types = get_customer_types()
+    return customer_types.get(customer_type) or customer_types["Retail"]
+
+
+def clear_customer_cache(doc, method=None):
+    users = set(_get_emails(doc))
+    if doc.doctype == "Customer":
+        users.update(frappe.cache().hget(CUSTOMER_USERS_KEY, doc.name) or [])
+        frappe.cache().hdel(CUSTOMER_USERS_KEY, doc.name)
+    _forget_users(users)
+
+
+def clear_price_list_cache(doc=None, method=None):
+    frappe.cache().delete_value(PRICE_LISTS_KEY)
+
+
+def _resolve(user):
+    customer = frappe.get_all(
+        "Customer",
+        filters={"email_id": user},
+        fields=["name", "customer_name", "customer_group"],
+        limit_page_length=1,
+    )
+    if not customer:
+        customer = _get_customer_via_contact(user)
+
+    if not customer:
+        return {"customer": None, "customer_name": None, "customer_group": None, "price_list": get_default_price_list()}
+
+    customer = customer[0]
+    return {
+        "customer": customer.name,
+        "customer_name": customer.customer_name or customer.name,
+        "customer_group": customer.customer_group,
+        "price_list": _get_price_list_for_group(customer.customer_group),
+    }
+
+
+def _get_customer_via_contact(user):
+    contact = frappe.get_all(
+        "Contact",
+        filters={"email_id": user},
+        fields=["name"],
+        limit_page_length=1,
+    )
+    if not contact:
+        return []
+    link = frappe.get_all(
+        "Dynamic Link",
+        filters={"parent": contact[0].name, "parenttype": "Contact", "link_doctype": "Customer"},
+        fields=["link_name"],
+        limit_page_length=1,
+    )
+    if not link:
+        return []
+    return frappe.get_all(
+        "Customer",
+        filters={"name": link[0].link_name},
+        fields=["name", "customer_name", "customer_group"],
+        limit_page_length=1,
+    )
+
+
+def _get_price_list_for_group(customer_group):
+    for settings in get_customer_types().values():
+        if settings.customer_group == customer_group and settings.price_list in _get_price_lists()["all"]:
+            return settings.price_list
+    return get_default_price_list()
+
+
+def _get_price_lists():
+    price_lists = frappe.cache().get_value(PRICE_LISTS_KEY)
+    if price_lists is None:
+        records = frappe.get_all("Price List", fields=["name", "selling"], order_by="creation asc")
+        price_lists = {
+            "all": [row.name for row in records],
+            "selling": [row.name for row in records if row.selling],
+        }
+        frappe.cache().set_value(PRICE_LISTS_KEY, price_lists)
+    return price_lists
+
+
+def _get_request_memo():
+    memo = getattr(frappe.local, "euro_website_customers", None)
+    if memo is None:
+        memo = frappe.local.euro_website_customers = {}
+    return memo
+
+
+def _remember_user(customer, user):
+    users = frappe.cache().hget(CUSTOMER_USERS_KEY, customer) or []
+    if user not in users:
+        frappe.cache().hset(CUSTOMER_USERS_KEY, customer, users + [user])
+
+
+def _forget_users(users):
+    memo = _get_request_memo()
+    for user in users:
+        if not user:
+            continue
+        frappe.cache().delete_value(CUSTOMER_KEY.format(user))
+        memo.pop(user, None)
+
+
+def _get_emails(doc):
+    emails = [doc.get("email_id")]
+    for row in doc.get("email_ids") or []:
+        emails.append(row.get("email_id"))
+    before = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if before:
+        emails.append(before.get("email_id"))
+    return [email for email in emails if email]
@@ -1,29 +1,77 @@
 import frappe
 
+from euro_website.customer import get_customer_type
+from euro_website.install import ensure_customer_type_records
+
 
 def ensure_web_customer(doc, method=None):
     # Only process web orders for guests or missing customer
     if doc.get("customer") and doc.customer != "Guest":
-        if not doc.get("is_webshop"):
+        if not doc.get("is_webshop") or doc.flags.defer_web_user:
             return
-        _ensure_user_for_customer(doc.customer, doc.get("contact_email") or doc.get("email_id"))
+        email = doc.get("contact_email") or doc.get("email_id")
+        identity = doc.flags.web_identity
+        if identity is None or identity.email != email:
+            _ensure_user_for_customer(doc.customer, email)
+        elif not identity.user:
+            _create_user(email)
         return
 
     email = _get_email(doc)
     if not email:
         return
 
+    identity = resolve_identity(email, _get_address_names(doc))
     customer_name = _get_customer_name(doc, email)
-    customer = _get_or_create_customer(customer_name, email, customer_type="Retail")
-    _ensure_contact(customer, customer_name, email)
-    _link_addresses(customer, doc)
-    _ensure_user_for_customer(customer, email)
+    customer = _get_or_create_customer(customer_name, email, customer_type="Retail", identity=identity)
+    _ensure_contact(customer, customer_name, email, identity=identity)
+    _link_addresses(customer, identity)
+    if not doc.flags.defer_web_user and not identity.user:
+        _create_user(email)
 
     doc.customer = customer
     doc.customer_name = customer_name
     _apply_price_list(doc, customer_type="Retail")
 
 
+def resolve_identity(email, address_names=()):
+    # Everything the hook needs to know about an email, in two queries
+    row = frappe.db.sql(
+        """
+        select
+            (select name from `tabCustomer` where email_id = %(email)s order by creation limit 1) as customer,
+            (select name from `tabContact` where email_id = %(email)s order by creation limit 1) as contact,
+            (select name from `tabUser` where name = %(email)s) as user
+        """,
+        {"email": email},
+        as_dict=True,
+    )[0]
+    identity = frappe._dict(
+        email=email,
+        customer=row.customer,
+        contact=row.contact,
+        user=row.user,
+        contact_customers=set(),
+        address_customers={name: set() for name in address_names},
+    )
+
+    parents = [name for name in [identity.contact, *address_names] if name]
+    if parents:
+        for link in frappe.db.sql(
+            """
+            select parent, parenttype, link_name from `tabDynamic Link`
+            where link_doctype = 'Customer' and parenttype in ('Contact', 'Address') and parent in %(parents)s
+            """,
+            {"parents": tuple(parents)},
+            as_dict=True,
+        ):
+            if link.parenttype == "Contact" and link.parent == identity.contact:
+                identity.contact_customers.add(link.link_name)
+            elif link.parenttype == "Address" and link.parent in identity.address_customers:
+                identity.address_customers[link.parent].add(link.link_name)
+    return identity
+
+
 def _get_email(doc):
     for key in ("contact_email", "email_id", "customer_email"):
         value = doc.get(key)
@@ -40,17 +88,18 @@ def _get_customer_name(doc, email):
     return email.split("@")[0].replace(".", " ").title()
 
 
-def _get_or_create_customer(name, email, customer_type="Retail"):
-    customer_group, price_list, customer_type_value = _get_group_and_price(customer_type)
-    existing = frappe.get_all(
-        "Customer",
-        filters={"email_id": email},
-        fields=["name"],
-        limit_page_length=1,
-    )
-    if existing:
-        return existing[0].name
+def _get_address_names(doc):
+    names = [doc.get(field) for field in ("shipping_address_name", "customer_address")]
+    return list(dict.fromkeys(name for name in names if name))
 
+
+def _get_or_create_customer(name, email, customer_type="Retail", identity=None):
+    if identity is None:
+        identity = resolve_identity(email)
+    if identity.customer:
+        return identity.customer
+
+    customer_group, price_list, customer_type_value = _get_group_and_price(customer_type)
     customer = frappe.get_doc(
         {
             "doctype": "Customer",
@@ -64,18 +113,18 @@ def _get_or_create_customer(name, email, customer_type="Retail"):
     )
     customer.flags.ignore_permissions = True
     customer.insert()
+    identity.customer = customer.name
     return customer.name
 
 
-def _ensure_contact(customer, name, email):
-    contact = frappe.get_all(
-        "Contact",
-        filters={"email_id": email},
-        fields=["name"],
-        limit_page_length=1,
-    )
-    if contact:
-        _link_contact_to_customer(contact[0].name, customer)
+def _ensure_contact(customer, name, email, identity=None):
+    if identity is None or identity.email != email:
+        identity = resolve_identity(email)
+
+    if identity.contact:
+        if customer not in identity.contact_customers:
+            _link_contact_to_customer(identity.contact, customer)
+            identity.contact_customers.add(customer)
         return
 
     contact_doc = frappe.get_doc(
@@ -88,6 +137,8 @@ def _ensure_contact(customer, name, email):
     )
     contact_doc.flags.ignore_permissions = True
     contact_doc.insert()
+    identity.contact = contact_doc.name
+    identity.contact_customers.add(customer)
 
 
 def _link_contact_to_customer(contact_name, customer):
@@ -100,17 +151,16 @@ def _link_contact_to_customer(contact_name, customer):
     contact_doc.save()
 
 
-def _link_addresses(customer, doc):
-    for field in ("shipping_address_name", "customer_address"):
-        address_name = doc.get(field)
-        if not address_name:
+def _link_addresses(customer, identity):
+    for address_name, customers in identity.address_customers.items():
+        if customer in customers:
             continue
         try:
             address = frappe.get_doc("Address", address_name)
-            if not any(link.link_doctype == "Customer" and link.link_name == customer for link in address.links):
-                address.append("links", {"link_doctype": "Customer", "link_name": customer})
-                address.flags.ignore_permissions = True
-                address.save()
+            address.append("links", {"link_doctype": "Customer", "link_name": customer})
+            address.flags.ignore_permissions = True
+            address.save()
+            customers.add(customer)
         except Exception:
             continue
 
@@ -122,6 +172,10 @@ def _ensure_user_for_customer(customer, email):
     if frappe.db.exists("User", email):
         return
 
+    _create_user(email)
+
+
+def _create_user(email):
     user = frappe.get_doc(
         {
             "doctype": "User",
@@ -148,25 +202,7 @@ def _apply_price_list(doc, customer_type="Retail"):
 
 
 def _get_group_and_price(customer_type):
-    if customer_type == "Wholesale":
-        customer_group = "Commercial"
-        price_list = "Standard Selling"
-        customer_type_value = "Company"
-    else:
-        customer_group = "Individual"
-        price_list = "Website Price List"
-        customer_type_value = "Individual"
-
-    if not frappe.db.exists("Customer Group", customer_group):
-        group = frappe.get_doc({"doctype": "Customer Group", "customer_group_name": customer_group})
-        group.flags.ignore_permissions = True
-        group.insert()
-
-    if not frappe.db.exists("Price List", price_list):
-        plist = frappe.get_doc(
-            {"doctype": "Price List", "price_list_name": price_list, "selling": 1, "currency": frappe.defaults.get_global_default("currency") or "USD"}
-        )
-        plist.flags.ignore_permissions = True
-        plist.insert()
-
-    return customer_group, price_list, customer_type_value
+    # install.bootstrap normally creates the records; this covers sites where it has not run yet
+    settings = get_customer_type(customer_type)
+    ensure_customer_type_records(settings)
+    return settings.customer_group, settings.price_list, settings.customer_type
@@ -0,0 +1,141 @@
+import random
+
+import frappe
+
+from euro_website.page_cache import clear_page_cache
+from euro_website.schema import get_available_fields
+
+HOME_KEY = "euro_website:home"
+# Bumped after a Website Item change commits; the snapshot remembers the generation it was built from
+HOME_GENERATION_KEY = "euro_website:home_generation"
+# One worker rebuilds a stale snapshot while the others keep serving the previous one
+HOME_LOCK_KEY = "euro_website:home_lock"
+HOME_LOCK_TTL = 60
+# Descriptions are cut at a word boundary; the hero shows the featured item's teaser
+DESCRIPTION_LENGTH = 300
+DESCRIPTION_FIELDS = ("website_description", "web_long_description", "description")
+
+
+def get_home_snapshot():
+    cache = frappe.cache()
+    snapshot = cache.get_value(HOME_KEY)
+    if not snapshot:
+        return refresh_home_snapshot()
+
+    stale = snapshot.get("date") != frappe.utils.nowdate() or snapshot.get("generation") != _get_generation()
+    if stale and cache.set(cache.make_key(HOME_LOCK_KEY), 1, nx=True, ex=HOME_LOCK_TTL):
+        try:
+            snapshot = refresh_home_snapshot()
+        finally:
+            cache.delete(cache.make_key(HOME_LOCK_KEY))
+    return snapshot
+
+
+def pick_featured_item(snapshot):
+    items = snapshot.get("featured_items") or []
+    if not items:
+        return None
+    return frappe._dict(random.choice(items))
+
+
+def refresh_home_snapshot():
+    # Read before the scan, so a change committed during it leaves the snapshot stale
+    generation = _get_generation()
+    fields = get_available_fields(
+        "Website Item",
+        [
+            "item_code",
+            "item_name",
+            "route",
+            "thumbnail",
+            "website_image",
+            "website_description",
+            "web_long_description",
+            "description",
+            "standard_rate",
+            "modified",
+        ],
+    )
+    items = frappe.get_all(
+        "Website Item",
+        filters={"published": 1},
+        fields=fields,
+        order_by="modified desc",
+        limit_page_length=500,
+    )
+    item_groups = _get_item_groups(items)
+    categories = sorted({group for group in item_groups.values() if group})
+
+    category = None
+    featured = items
+    if categories:
+        category = categories[frappe.utils.getdate().toordinal() % len(categories)]
+        featured = [item for item in items if item_groups.get(item.item_code) == category] or items
+
+    snapshot = {
+        "date": frappe.utils.nowdate(),
+        "generation": generation,
+        "category": category,
+        "featured_items": [_compact(item) for item in featured],
+        "lineup": [_compact(item) for item in items[:4]],
+    }
+    frappe.cache().set_value(HOME_KEY, snapshot)
+    return snapshot
+
+
+def refresh_home_page():
+    refresh_home_snapshot()
+    clear_page_cache()
+
+
+def clear_home_snapshot(doc=None, method=None):
+    # Marks the snapshot stale instead of deleting it, so requests never wait on a cold rebuild
+    frappe.db.after_commit.add(_bump_generation)
+
+
+def _bump_generation():
+    cache = frappe.cache()
+    cache.incr(cache.make_key(HOME_GENERATION_KEY))
+
+
+def _get_generation():
+    cache = frappe.cache()
+    return int(cache.get(cache.make_key(HOME_GENERATION_KEY)) or 0)
+
+
+def _compact(item):
+    record = {
+        "item_code": item.item_code,
+        "item_name": item.item_name,
+        "route": item.get("route"),
+        "thumbnail": item.get("thumbnail"),
+        "website_image": item.get("website_image"),
+        "standard_rate": item.get("standard_rate"),
+    }
+    for field in DESCRIPTION_FIELDS:
+        text = frappe.utils.strip_html(item.get(field) or "").strip()
+        if text:
+            record["website_description"] = _truncate(text)
+            break
+    return record
+
+
+def _truncate(text):
+    if len(text) <= DESCRIPTION_LENGTH:
+        return text
+    # One extra character tells whether the last word ends exactly at the limit
+    cut = text[: DESCRIPTION_LENGTH + 1].rsplit(None, 1)[0][:DESCRIPTION_LENGTH]
+    return cut.rstrip(" ,.;:-") + "..."
+
+
+def _get_item_groups(items):
+    codes = [item.item_code for item in items if item.get("item_code")]
+    if not codes:
+        return {}
+
+    records = frappe.get_all(
+        "Item",
+        filters={"item_code": ["in", codes]},
+        fields=["item_code", "item_group"],
+    )
+    return {record.item_code: record.item_group for record in records}
@@ -29,12 +29,140 @@ web_include_js = [
     "/assets/euro_website/js/store.js",
 ]
 
+page_renderer = [
+    "euro_website.page_cache.CachedTemplatePage",
+]
+
 website_route_rules = [
     {"from_route": "/store/<item>", "to_route": "store/item"},
 ]
 
+before_request = ["euro_website.instrumentation.before_request"]
+after_request = ["euro_website.instrumentation.after_request"]
+
+after_install = "euro_website.install.after_install"
+setup_wizard_complete = "euro_website.install.after_setup_wizard"
+
+after_migrate = [
+    "euro_website.schema.clear_schema_cache",
+    "euro_website.reviews.clear_review_cache",
+    "euro_website.install.bootstrap",
+]
+
+scheduler_events = {
+    "daily": [
+        "euro_website.home.refresh_home_page",
+    ],
+}
+
 doc_events = {
+    "DocType": {
+        "on_update": "euro_website.schema.clear_schema_cache",
+        "on_trash": "euro_website.schema.clear_schema_cache",
+    },
+    "Custom Field": {
+        "on_update": "euro_website.schema.clear_schema_cache",
+        "on_trash": "euro_website.schema.clear_schema_cache",
+    },
     "Sales Order": {
         "before_insert": "euro_website.handlers.ensure_web_customer",
-    }
+        "on_submit": [
+            "euro_website.stock.clear_stock_cache",
+            "euro_website.portal.clear_portal_summary",
+        ],
+        "on_cancel": [
+            "euro_website.stock.clear_stock_cache",
+            "euro_website.portal.clear_portal_summary",
+        ],
+    },
+    "Sales Invoice": {
+        "on_submit": "euro_website.portal.clear_portal_summary",
+        "on_cancel": "euro_website.portal.clear_portal_summary",
+    },
+    "Payment Entry": {
+        "on_submit": "euro_website.portal.clear_portal_summary",
+        "on_cancel": "euro_website.portal.clear_portal_summary",
+    },
+    "Stock Ledger Entry": {
+        "on_submit": "euro_website.stock.clear_stock_cache",
+    },
+    "Customer": {
+        "on_update": "euro_website.customer.clear_customer_cache",
+        "on_trash": "euro_website.customer.clear_customer_cache",
+    },
+    "Contact": {
+        "on_update": "euro_website.customer.clear_customer_cache",
+        "on_trash": "euro_website.customer.clear_customer_cache",
+    },
+    "Price List": {
+        "on_update": "euro_website.customer.clear_price_list_cache",
+        "on_trash": "euro_website.customer.clear_price_list_cache",
+    },
+    "Item": {
+        "on_update": [
+            "euro_website.categories.clear_category_cache",
+            "euro_website.pricing.clear_item_cache",
+            "euro_website.warehouse.clear_item_warehouse_cache",
+            "euro_website.page_cache.clear_page_cache",
+        ],
+        "on_trash": [
+            "euro_website.categories.clear_category_cache",
+            "euro_website.pricing.clear_item_cache",
+            "euro_website.warehouse.clear_item_warehouse_cache",
+            "euro_website.page_cache.clear_page_cache",
+        ],
+    },
+    "Warehouse": {
+        "on_update": "euro_website.warehouse.clear_warehouse_cache",
+        "on_trash": "euro_website.warehouse.clear_warehouse_cache",
+    },
+    "Company": {
+        "on_update": "euro_website.warehouse.clear_warehouse_cache",
+        "on_trash": "euro_website.warehouse.clear_warehouse_cache",
+    },
+    "Stock Settings": {
+        "on_update": "euro_website.warehouse.clear_warehouse_cache",
+    },
+    "Item Price": {
+        "on_update": [
+            "euro_website.pricing.clear_item_price_cache",
+            "euro_website.page_cache.clear_page_cache",
+        ],
+        "on_trash": [
+            "euro_website.pricing.clear_item_price_cache",
+            "euro_website.page_cache.clear_page_cache",
+        ],
+    },
+    "Item Review": {
+        "after_insert": [
+            "euro_website.reviews.on_review_insert",
+            "euro_website.page_cache.clear_page_cache",
+        ],
+        "on_update": [
+            "euro_website.reviews.on_review_update",
+            "euro_website.page_cache.clear_page_cache",
+        ],
+        "on_trash": [
+            "euro_website.reviews.on_review_trash",
+            "euro_website.page_cache.clear_page_cache",
+        ],
+    },
+    "Website Item": {
+        "on_update": [
+            "euro_website.search.update_index",
+            "euro_website.categories.clear_category_cache",
+            "euro_website.page_cache.clear_page_cache",
+            "euro_website.home.clear_home_snapshot",
+            "euro_website.product.clear_item_detail",
+            "euro_website.product.update_route_map",
+        ],
+        "on_trash": [
+            "euro_website.search.remove_from_index",
+            "euro_website.categories.clear_category_cache",
+            "euro_website.page_cache.clear_page_cache",
+            "euro_website.home.clear_home_snapshot",
+            "euro_website.product.clear_item_detail",
+            "euro_website.product.update_route_map",
+        ],
+    },
 }
@@ -0,0 +1,68 @@
+import frappe
+
+from euro_website.customer import clear_price_list_cache, get_customer_types
+
+
+# site -> customer types whose records are known to exist in this process
+_ensured = {}
+
+
+def after_install():
+    bootstrap()
+
+
+def after_setup_wizard(args=None):
+    # Sites installed before the wizard ran could not create the records yet
+    bootstrap()
+
+
+def bootstrap():
+    # Runs after install and every migrate so the order hooks can assume these records exist
+    for settings in get_customer_types().values():
+        try:
+            ensure_customer_type_records(settings)
+        except Exception:
+            # A fresh site may not have run the setup wizard yet; the next migrate retries
+            frappe.log_error(title="Euro Website bootstrap failed")
+    clear_price_list_cache()
+
+
+def ensure_customer_type_records(settings):
+    # Fallback for the order path when bootstrap could not run yet; checked once per process
+    ensured = _ensured.setdefault(frappe.local.site, {})
+    key = (settings.customer_group, settings.price_list)
+    if key in ensured:
+        return
+    created = _ensure_customer_group(settings.customer_group)
+    created = _ensure_price_list(settings.price_list) or created
+    if created:
+        # Records created in the current transaction are not remembered until it commits
+        frappe.db.after_commit.add(clear_price_list_cache)
+        frappe.db.after_commit.add(lambda: ensured.__setitem__(key, True))
+    else:
+        ensured[key] = True
+
+
+def _ensure_customer_group(customer_group):
+    if frappe.db.exists("Customer Group", customer_group):
+        return False
+    group = frappe.get_doc({"doctype": "Customer Group", "customer_group_name": customer_group})
+    group.flags.ignore_permissions = True
+    group.insert()
+    return True
+
+
+def _ensure_price_list(price_list):
+    if frappe.db.exists("Price List", price_list):
+        return False
+    plist = frappe.get_doc(
+        {
+            "doctype": "Price List",
+            "price_list_name": price_list,
+            "selling": 1,
+            "currency": frappe.defaults.get_global_default("currency") or "USD",
+        }
+    )
+    plist.flags.ignore_permissions = True
+    plist.insert()
+    return True
@@ -0,0 +1,165 @@
+import time
+
+import frappe
+
+TIMING_KEY = "euro_website:timing:{}"
+# Percentiles cover the last WINDOW_COUNT windows of WINDOW_SECONDS each
+WINDOW_SECONDS = 60
+WINDOW_COUNT = 15
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Bucket upper bounds per metric; the last bucket is open-ended
+BUCKETS = {
+    "wall_ms": (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+    "db_ms": (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    "queries": (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+}
+
+# Only these pages get their own series, so probing random URLs cannot grow the key space
+TRACKED_PAGES = ("/", "/store", "/store/<item>", "/portal", "/checkout", "/order", "/wishlist")
+
+
+def instrumentation_enabled():
+    return bool(frappe.conf.get("euro_website_instrumentation", 1))
+
+
+def before_request():
+    if not instrumentation_enabled():
+        return
+
+    state = frappe.local.euro_website_timing = {"start": time.perf_counter(), "queries": 0, "db_time": 0.0}
+    db = frappe.db
+    sql = db.sql
+
+    def timed_sql(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return sql(*args, **kwargs)
+        finally:
+            state["queries"] += 1
+            state["db_time"] += time.perf_counter() - started
+
+    # frappe.db is per request, so the wrapper goes away with it
+    db.sql = timed_sql
+
+
+def after_request(response=None, request=None):
+    state = getattr(frappe.local, "euro_website_timing", None)
+    if not state:
+        return
+    frappe.local.euro_website_timing = None
+
+    wall_ms = (time.perf_counter() - state["start"]) * 1000
+    db_ms = state["db_time"] * 1000
+    if response is not None:
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={db_ms:.1f};desc="{state["queries"]} queries"',
+                f"app;dur={wall_ms - db_ms:.1f}",
+                f"total;dur={wall_ms:.1f}",
+            ]
+        )
+
+    route = _get_route(request)
+    if route:
+        try:
+            _record(route, {"wall_ms": wall_ms, "db_ms": db_ms, "queries": state["queries"]})
+        except Exception:
+            # Metrics must never fail a request
+            pass
+
+
+def get_route_stats():
+    totals = {}
+    for fields in _read_windows():
+        for field, count in fields.items():
+            totals[field] = totals.get(field, 0) + float(count)
+
+    stats = {}
+    for field, value in totals.items():
+        route, metric, part = field.rsplit("|", 2)
+        entry = stats.setdefault(route, {}).setdefault(metric, {"count": 0, "sum": 0.0, "buckets": {}})
+        if part == "count":
+            entry["count"] = int(value)
+        elif part == "sum":
+            entry["sum"] = value
+        else:
+            entry["buckets"][int(part)] = int(value)
+
+    for metrics in stats.values():
+        for metric, entry in metrics.items():
+            entry["quantiles"] = {
+                q: _quantile(BUCKETS[metric], entry["buckets"], entry["count"], q) for q in QUANTILES
+            }
+    return stats
+
+
+def render_prometheus(stats):
+    lines = []
+    for metric in BUCKETS:
+        name = f"euro_website_request_{metric}"
+        lines.append(f"# TYPE {name} summary")
+        for route in sorted(stats):
+            entry = stats[route].get(metric)
+            if not entry:
+                continue
+            label = route.replace("\\", "\\\\").replace('"', '\\"')
+            for q, value in entry["quantiles"].items():
+                lines.append(f'{name}{{route="{label}",quantile="{q}"}} {value}')
+            lines.append(f'{name}_sum{{route="{label}"}} {entry["sum"]:.3f}')
+            lines.append(f'{name}_count{{route="{label}"}} {entry["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def _get_route(request):
+    path = (request.path if request is not None else "") or "/"
+    if path.startswith("/api/method/"):
+        method = path[len("/api/method/"):]
+        return f"api:{method}" if method.startswith("euro_website.") else None
+    if path.startswith("/store/"):
+        return "/store/<item>"
+    path = path.rstrip("/") or "/"
+    return path if path in TRACKED_PAGES else None
+
+
+def _record(route, values):
+    cache = frappe.cache()
+    key = cache.make_key(TIMING_KEY.format(int(time.time() // WINDOW_SECONDS)))
+    pipe = cache.pipeline()
+    for metric, value in values.items():
+        pipe.hincrby(key, f"{route}|{metric}|{_bucket(BUCKETS[metric], value)}", 1)
+        pipe.hincrby(key, f"{route}|{metric}|count", 1)
+        pipe.hincrbyfloat(key, f"{route}|{metric}|sum", value)
+    pipe.expire(key, WINDOW_SECONDS * (WINDOW_COUNT + 1))
+    pipe.execute()
+
+
+def _read_windows():
+    cache = frappe.cache()
+    current = int(time.time() // WINDOW_SECONDS)
+    pipe = cache.pipeline()
+    for window in range(current - WINDOW_COUNT + 1, current + 1):
+        pipe.hgetall(cache.make_key(TIMING_KEY.format(window)))
+    return [
+        {field.decode() if isinstance(field, bytes) else field: count for field, count in fields.items()}
+        for fields in pipe.execute()
+    ]
+
+
+def _bucket(bounds, value):
+    for index, bound in enumerate(bounds):
+        if value <= bound:
+            return index
+    return len(bounds)
+
+
+def _quantile(bounds, buckets, count, q):
+    # Upper bound of the bucket holding the q-th observation; the open bucket reports its floor
+    if not count:
+        return 0
+    seen = 0
+    for index in range(len(bounds) + 1):
+        seen += buckets.get(index, 0)
+        if seen >= q * count:
+            return bounds[index] if index < len(bounds) else bounds[-1]
+    return bounds[-1]
@@ -0,0 +1,96 @@
+import frappe
+
+from euro_website.customer import get_customer
+
+ORDER_STATUS_KEY = "euro_website:order_status:{}"
+ORDER_STATUS_TTL = 24 * 60 * 60
+# Shown instead of the exception; the details go to the Error Log
+SUBMIT_FAILED_MESSAGE = "We received your order and will confirm it shortly."
+
+
+def async_orders_enabled():
+    return bool(frappe.conf.get("euro_website_async_orders"))
+
+
+def queue_web_order(sales_order, email=None, profile=None):
+    set_order_status(sales_order, "queued", owner=get_status_owner(create=True))
+    frappe.enqueue(
+        "euro_website.orders.process_web_order",
+        queue="short",
+        enqueue_after_commit=True,
+        sales_order=sales_order,
+        email=email,
+        profile=profile,
+    )
+
+
+def process_web_order(sales_order, email=None, profile=None):
+    status, warning = "submitted", None
+    try:
+        so = frappe.get_doc("Sales Order", sales_order)
+        so.flags.ignore_permissions = True
+        so.submit()
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(title=f"Web order {sales_order} could not be submitted")
+        so = frappe.get_doc("Sales Order", sales_order)
+        status, warning = "draft", SUBMIT_FAILED_MESSAGE
+
+    from euro_website.api import _update_contact_for_user
+    from euro_website.handlers import _ensure_user_for_customer
+
+    try:
+        _ensure_user_for_customer(so.customer, email)
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+
+    if profile and frappe.session.user != "Guest":
+        try:
+            _update_contact_for_user(
+                frappe.session.user,
+                profile.get("full_name"),
+                profile.get("email"),
+                profile.get("phone"),
+            )
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+
+    set_order_status(sales_order, status, warning)
+
+
+def set_order_status(sales_order, status, warning=None, owner=None):
+    key = ORDER_STATUS_KEY.format(sales_order)
+    if owner is None:
+        # The background job keeps the owner recorded by the request that placed the order
+        owner = (frappe.cache().get_value(key) or {}).get("owner")
+    frappe.cache().set_value(
+        key,
+        {"status": status, "warning": warning, "owner": owner},
+        expires_in_sec=ORDER_STATUS_TTL,
+    )
+
+
+def get_status_owner(create=False):
+    # Same owner key as the cart: the user, or the guest's cart cookie
+    from euro_website.cart import _get_owner
+
+    return _get_owner(create=create)
+
+
+def read_order_status(sales_order):
+    unknown = {"status": "unknown", "warning": None}
+    status = frappe.cache().get_value(ORDER_STATUS_KEY.format(sales_order))
+    if status and status.get("owner") and status["owner"] == get_status_owner():
+        return {"status": status["status"], "warning": status.get("warning")}
+
+    # Logged-in customers can also look up their own older orders
+    customer = get_customer() if frappe.session.user != "Guest" else None
+    if not customer:
+        return unknown
+    docstatus = frappe.db.get_value("Sales Order", {"name": sales_order, "customer": customer}, "docstatus")
+    if docstatus is None:
+        return unknown
+    return {"status": "submitted" if docstatus == 1 else "draft", "warning": None}
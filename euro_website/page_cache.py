@@ -0,0 +1,107 @@
+import hashlib
+
+import frappe
+from frappe.website.page_renderers.template_page import TemplatePage
+from werkzeug.wrappers import Response
+
+from euro_website.customer import get_price_list
+
+VERSION_KEY = "euro_website:page_version"
+PAGE_KEY = "euro_website:page:{}"
+FRAGMENT_KEY = "euro_website:fragment:{}:{}"
+PAGE_CACHE_TTL = 10 * 60
+FRAGMENT_CACHE_TTL = 10 * 60
+
+# Catalog pages whose output only depends on the route, query and price list.
+# They keep no_cache = 1 so Frappe's own path-only page cache stays out of the way.
+CACHEABLE_ROUTES = ("", "index", "store", "store/item")
+
+
+class CachedTemplatePage(TemplatePage):
+    def can_render(self):
+        return self.path in CACHEABLE_ROUTES and super().can_render()
+
+    def render(self):
+        if frappe.request.method not in ("GET", "HEAD"):
+            return super().render()
+
+        version = get_version()
+        etag = hashlib.md5(_get_signature(self.path, version).encode()).hexdigest()
+        guest = frappe.session.user == "Guest"
+        if etag in frappe.request.if_none_match:
+            return _not_modified(etag, version, guest)
+
+        html = frappe.cache().get_value(PAGE_KEY.format(etag)) if guest else None
+        if html is None:
+            html = self.get_html()
+            if guest:
+                frappe.cache().set_value(PAGE_KEY.format(etag), html, expires_in_sec=PAGE_CACHE_TTL)
+
+        response = self.build_response(self.add_csrf_token(html))
+        _set_validators(response, etag, version, guest)
+        return response
+
+
+def get_fragment(name, key, builder):
+    digest = hashlib.md5(f"{get_version()['version']}|{key}".encode()).hexdigest()
+    cache_key = FRAGMENT_KEY.format(name, digest)
+    value = frappe.cache().get_value(cache_key)
+    if value is None:
+        value = builder()
+        frappe.cache().set_value(cache_key, value, expires_in_sec=FRAGMENT_CACHE_TTL)
+    return value
+
+
+def get_version():
+    version = frappe.cache().get_value(VERSION_KEY)
+    if not version:
+        version = _bump_version()
+    return version
+
+
+def clear_page_cache(doc=None, method=None):
+    # Old pages and fragments become unreachable and expire on their TTL
+    _bump_version()
+
+
+def _bump_version():
+    version = {
+        "version": frappe.generate_hash(length=12),
+        "modified": frappe.utils.now_datetime().replace(microsecond=0),
+    }
+    frappe.cache().set_value(VERSION_KEY, version)
+    return version
+
+
+def _get_signature(path, version):
+    parts = [version["version"], path or "index", _get_query(path), get_price_list() or ""]
+    if frappe.session.user != "Guest":
+        # The page embeds the session's CSRF token, so a new login must not revalidate old HTML
+        parts.extend([frappe.session.user, frappe.session.sid or ""])
+    return "|".join(parts)
+
+
+def _get_query(path):
+    if path == "store":
+        from euro_website.www.store import index as store_page
+
+        filters = store_page._get_filters()
+        page, page_size = store_page._get_paging()
+        cursor = frappe.form_dict.get("cursor") or ""
+        return f"{store_page._build_base_query(filters, page_size)}&page={page}&cursor={cursor}"
+    if path == "store/item":
+        return frappe.form_dict.get("item") or ""
+    # The home lineup rotates daily
+    return frappe.utils.nowdate()
+
+
+def _not_modified(etag, version, guest):
+    response = Response(status=304)
+    _set_validators(response, etag, version, guest)
+    return response
+
+
+def _set_validators(response, etag, version, guest):
+    response.headers["Cache-Control"] = "no-cache" if guest else "private, no-cache"
+    response.set_etag(etag)
+    response.last_modified = version["modified"]
@@ -0,0 +1,132 @@
+import time
+
+import frappe
+
+from euro_website.cursor import decode_cursor, encode_cursor
+
+SUMMARY_KEY = "euro_website:portal_summary"
+# Journal Entries and reconciliations change outstanding amounts without any hook here
+SUMMARY_CACHE_TTL = 5 * 60
+PORTAL_PAGE_LENGTH = 20
+MAX_PORTAL_PAGE_LENGTH = 50
+
+# Portal tab -> document list definition; rows are paged by (date, name) descending
+PORTAL_LISTS = {
+    "orders": {
+        "doctype": "Sales Order",
+        "date_field": "transaction_date",
+        "party_condition": "customer = %(customer)s",
+        "amount_field": "grand_total",
+        "fields": ["name", "transaction_date", "status", "grand_total"],
+    },
+    "invoices": {
+        "doctype": "Sales Invoice",
+        "date_field": "posting_date",
+        "party_condition": "customer = %(customer)s",
+        "amount_field": "outstanding_amount",
+        "fields": ["name", "posting_date", "status", "grand_total", "outstanding_amount"],
+    },
+    "payments": {
+        "doctype": "Payment Entry",
+        "date_field": "posting_date",
+        "party_condition": "party_type = 'Customer' and party = %(customer)s",
+        "amount_field": "paid_amount",
+        "currency_field": "paid_to_account_currency",
+        "fields": ["name", "posting_date", "status", "paid_amount", "paid_to_account_currency"],
+    },
+}
+
+
+def get_portal_summary(customer):
+    cached = frappe.cache().hget(SUMMARY_KEY, customer)
+    if cached is None or time.time() - cached.get("at", 0) >= SUMMARY_CACHE_TTL:
+        cached = {"at": time.time(), "summary": _fetch_summary(customer)}
+        frappe.cache().hset(SUMMARY_KEY, customer, cached)
+    return cached["summary"]
+
+
+def get_portal_page(kind, customer, status=None, cursor=None, page_length=PORTAL_PAGE_LENGTH):
+    definition = PORTAL_LISTS[kind]
+    date_field = definition["date_field"]
+    page_length = min(max(1, frappe.utils.cint(page_length) or PORTAL_PAGE_LENGTH), MAX_PORTAL_PAGE_LENGTH)
+
+    conditions = [definition["party_condition"]]
+    values = {"customer": customer, "page_length": page_length + 1}
+    if status:
+        conditions.append("status = %(status)s")
+        values["status"] = status
+    after = decode_cursor(cursor)
+    if after and after.get("date") and after.get("name"):
+        conditions.append(
+            f"({date_field} < %(after_date)s or ({date_field} = %(after_date)s and name < %(after_name)s))"
+        )
+        values.update(after_date=after["date"], after_name=after["name"])
+
+    rows = frappe.db.sql(
+        f"""
+        select {", ".join(definition["fields"])}
+        from `tab{definition["doctype"]}`
+        where {" and ".join(conditions)}
+        order by {date_field} desc, name desc
+        limit %(page_length)s
+        """,
+        values,
+        as_dict=True,
+    )
+    next_cursor = None
+    if len(rows) > page_length:
+        rows = rows[:page_length]
+        last = rows[-1]
+        next_cursor = encode_cursor({"date": last[date_field], "name": last.name})
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def format_portal_rows(kind, rows):
+    # Rows loaded by the client are shown next to the server-rendered ones, so they use the same formatting
+    definition = PORTAL_LISTS[kind]
+    currency_field = definition.get("currency_field")
+    for row in rows:
+        row.date_display = frappe.utils.formatdate(row[definition["date_field"]])
+        row.amount_display = frappe.utils.fmt_money(
+            row[definition["amount_field"]], currency=row.get(currency_field) if currency_field else None
+        )
+    return rows
+
+
+def clear_portal_summary(doc, method=None):
+    customer = doc.get("customer")
+    if doc.doctype == "Payment Entry":
+        customer = doc.get("party") if doc.get("party_type") == "Customer" else None
+    if customer:
+        frappe.cache().hdel(SUMMARY_KEY, customer)
+
+
+def _fetch_summary(customer):
+    # Submitted documents only; drafts and cancelled ones don't count towards the ledger
+    rows = frappe.db.sql(
+        """
+        select 'orders' as kind, count(*) as count, coalesce(sum(grand_total), 0) as total, 0 as outstanding
+        from `tabSales Order`
+        where customer = %(customer)s and docstatus = 1
+        union all
+        select 'invoices', count(*), coalesce(sum(grand_total), 0), coalesce(sum(outstanding_amount), 0)
+        from `tabSales Invoice`
+        where customer = %(customer)s and docstatus = 1
+        union all
+        select 'payments', count(*), coalesce(sum(paid_amount), 0), 0
+        from `tabPayment Entry`
+        where party_type = 'Customer' and party = %(customer)s and payment_type = 'Receive' and docstatus = 1
+        """,
+        {"customer": customer},
+        as_dict=True,
+    )
+    totals = {row.kind: row for row in rows}
+    return {
+        "order_count": totals["orders"].count,
+        "order_total": frappe.utils.flt(totals["orders"].total),
+        "invoice_count": totals["invoices"].count,
+        "invoice_total": frappe.utils.flt(totals["invoices"].total),
+        "outstanding_total": frappe.utils.flt(totals["invoices"].outstanding),
+        "payment_count": totals["payments"].count,
+        "payments_total": frappe.utils.flt(totals["payments"].total),
+    }
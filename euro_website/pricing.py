@@ -0,0 +1,133 @@
+import time
+
+import frappe
+
+from euro_website.cache import hget_many, hset_many
+from euro_website.customer import get_default_price_list
+
+PRICES_KEY = "euro_website:prices:{}"
+# Backstop for an invalidation that was ever missed
+PRICE_CACHE_TTL = 10 * 60
+
+
+def get_item_prices(item_codes, price_list=None, customer=None):
+    codes = list(dict.fromkeys(code for code in item_codes if code))
+    if not codes:
+        return {}
+    if not price_list:
+        price_list = _get_customer_price_list(customer)
+    if not price_list:
+        return {}
+
+    now = time.time()
+    entries = {
+        code: entry
+        for code, entry in hget_many(PRICES_KEY.format(price_list), codes).items()
+        if now - entry.get("at", 0) < PRICE_CACHE_TTL
+    }
+    missing = [code for code in codes if code not in entries]
+    if missing:
+        fetched = _fetch_entries(missing, price_list, now)
+        hset_many(PRICES_KEY.format(price_list), fetched)
+        entries.update(fetched)
+
+    today = frappe.utils.nowdate()
+    prices = {}
+    for code in codes:
+        rate = _pick_rate(entries.get(code), customer, today)
+        if rate is not None:
+            prices[code] = rate
+    return prices
+
+
+def get_item_price(item_code, price_list=None, customer=None):
+    return get_item_prices([item_code], price_list=price_list, customer=customer).get(item_code)
+
+
+def clear_item_price_cache(doc, method=None):
+    price_lists = {doc.get("price_list")}
+    item_codes = {doc.item_code}
+    before = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if before:
+        price_lists.add(before.get("price_list"))
+        item_codes.add(before.get("item_code"))
+    _clear_after_commit([price_list for price_list in price_lists if price_list], item_codes)
+
+
+def clear_item_cache(doc, method=None):
+    # Stock UOM decides which Item Price rows apply, so drop the item everywhere
+    _clear_after_commit(frappe.get_all("Price List", pluck="name"), {doc.name})
+
+
+def _clear_after_commit(price_lists, item_codes):
+    # Clearing before commit would let a concurrent read cache the old rows again
+    codes = [code for code in item_codes if code]
+
+    def clear():
+        for price_list in price_lists:
+            for code in codes:
+                frappe.cache().hdel(PRICES_KEY.format(price_list), code)
+
+    frappe.db.after_commit.add(clear)
+
+
+def _fetch_entries(item_codes, price_list, now):
+    rows = frappe.db.sql(
+        """
+        select item.name as item_code, item.stock_uom,
+            price.price_list_rate, price.uom, price.customer, price.valid_from, price.valid_upto
+        from `tabItem` item
+        left join `tabItem Price` price
+            on price.item_code = item.name and price.price_list = %(price_list)s and price.selling = 1
+        where item.name in %(item_codes)s
+        """,
+        {"price_list": price_list, "item_codes": tuple(item_codes)},
+        as_dict=True,
+    )
+
+    # Every requested code gets an entry so items without a price are cached too
+    entries = {code: {"stock_uom": None, "rows": [], "at": now} for code in item_codes}
+    for row in rows:
+        entry = entries.setdefault(row.item_code, {"stock_uom": None, "rows": [], "at": now})
+        entry["stock_uom"] = row.stock_uom
+        if row.price_list_rate is None:
+            continue
+        entry["rows"].append(
+            {
+                "rate": row.price_list_rate,
+                "uom": row.uom,
+                "customer": row.customer,
+                "valid_from": str(row.valid_from) if row.valid_from else None,
+                "valid_upto": str(row.valid_upto) if row.valid_upto else None,
+            }
+        )
+    return entries
+
+
+def _pick_rate(entry, customer, today):
+    if not entry:
+        return None
+    best = None
+    for row in entry["rows"]:
+        if row["valid_from"] and row["valid_from"] > today:
+            continue
+        if row["valid_upto"] and row["valid_upto"] < today:
+            continue
+        if row["customer"] and row["customer"] != customer:
+            continue
+        # Rates are per stock unit; a "Box" price would need a conversion factor we do not apply
+        if row["uom"] not in (None, "", entry["stock_uom"]):
+            continue
+        # Customer-specific beats generic, newest window wins
+        rank = (1 if row["customer"] else 0, row["valid_from"] or "")
+        if best is None or rank > best[0]:
+            best = (rank, row["rate"])
+    return best[1] if best else None
+
+
+def _get_customer_price_list(customer):
+    if customer:
+        price_list = frappe.db.get_value("Customer", customer, "default_price_list")
+        if price_list:
+            return price_list
+    return get_default_price_list()
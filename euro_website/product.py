@@ -0,0 +1,274 @@
+import time
+
+import frappe
+
+from euro_website.cache import hget_many, hset_many
+from euro_website.schema import get_available_fields, get_child_doctype
+
+DETAIL_KEY = "euro_website:item_detail"
+# Backstop for changes that do not go through a Website Item save
+DETAIL_CACHE_TTL = 60 * 60
+ROUTES_KEY = "euro_website:item_routes"
+MISSING_KEY = "euro_website:item_route_missing:{}"
+MISSING_ROUTE_TTL = 5 * 60
+# Marks a fully built route map, so an empty hash is not mistaken for "no such route"
+BUILT_FIELD = "::built"
+# Only one worker scans the table at a time; saves patch single entries after commit
+ROUTES_LOCK_KEY = "euro_website:item_routes_lock"
+ROUTES_LOCK_TTL = 60
+ROUTES_LOCK_WAIT = 5
+ROUTES_GENERATION_KEY = "euro_website:item_routes_generation"
+# Backstop in case an entry was ever missed
+ROUTES_TTL = 24 * 60 * 60
+
+ITEM_FIELDS = [
+    "name",
+    "item_code",
+    "item_name",
+    "route",
+    "image",
+    "thumbnail",
+    "website_image",
+    "website_description",
+    "web_long_description",
+    "description",
+    "standard_rate",
+]
+IMAGE_TABLE = "images"
+SPECS_TABLE = "website_specifications"
+
+
+def find_item_by_route(route):
+    # (website item name, canonical route) for a route or a legacy item_code
+    found = hget_many(ROUTES_KEY, [route, BUILT_FIELD])
+    if route in found:
+        return found[route]
+
+    cache = frappe.cache()
+    if cache.get_value(MISSING_KEY.format(route)):
+        return None
+    if BUILT_FIELD not in found:
+        found = rebuild_route_map() or hget_many(ROUTES_KEY, [route])
+        if route in found:
+            return found[route]
+
+    # Bots probing random slugs stop at Redis until the miss expires
+    cache.set_value(MISSING_KEY.format(route), 1, expires_in_sec=MISSING_ROUTE_TTL)
+    return None
+
+
+def rebuild_route_map():
+    cache = frappe.cache()
+    lock = cache.make_key(ROUTES_LOCK_KEY)
+    if not cache.set(lock, 1, nx=True, ex=ROUTES_LOCK_TTL):
+        # Another worker is scanning the table; use its map once ready, or answer from our own read
+        for _ in range(ROUTES_LOCK_WAIT * 10):
+            time.sleep(0.1)
+            if hget_many(ROUTES_KEY, [BUILT_FIELD]):
+                return None
+        return _read_route_map()
+
+    try:
+        generation = cache.get(cache.make_key(ROUTES_GENERATION_KEY))
+        mapping = _read_route_map()
+        cache.delete_value(ROUTES_KEY)
+        hset_many(ROUTES_KEY, mapping)
+        cache.expire(cache.make_key(ROUTES_KEY), ROUTES_TTL)
+        if cache.get(cache.make_key(ROUTES_GENERATION_KEY)) != generation:
+            # An item changed while we were reading; our map may already be stale
+            cache.delete_value(ROUTES_KEY)
+        return mapping
+    finally:
+        cache.delete(lock)
+
+
+def update_route_map(doc, method=None):
+    # Applied after commit so a concurrent rebuild cannot miss the change
+    previous = doc.get_doc_before_save() if method == "on_update" else None
+    stale = {value for value in (doc.get("route"), doc.get("item_code")) if value}
+    if previous:
+        stale.update(value for value in (previous.get("route"), previous.get("item_code")) if value)
+    current = None
+    if method != "on_trash" and doc.get("published"):
+        current = (doc.get("route"), doc.get("item_code"), doc.get("route") or doc.get("item_code"))
+    name = doc.name
+    frappe.db.after_commit.add(lambda: _apply_route_change(name, stale, current))
+
+
+def _apply_route_change(name, stale, current):
+    cache = frappe.cache()
+    cache.incr(cache.make_key(ROUTES_GENERATION_KEY))
+    keys = sorted(stale)
+    for key in keys:
+        cache.delete_value(MISSING_KEY.format(key))
+
+    found = hget_many(ROUTES_KEY, keys + [BUILT_FIELD])
+    if BUILT_FIELD not in found:
+        # Nothing built yet; the next lookup scans the table anyway
+        return
+    for key in keys:
+        if key in found and found[key][0] == name:
+            cache.hdel(ROUTES_KEY, key)
+    if not current:
+        return
+
+    route, item_code, canonical = current
+    entries = {}
+    if route:
+        entries[route] = (name, canonical)
+    # A legacy item_code never shadows another item's real route
+    if item_code and item_code not in entries:
+        existing = hget_many(ROUTES_KEY, [item_code]).get(item_code)
+        if not existing or existing[0] == name or existing[1] != item_code:
+            entries[item_code] = (name, canonical)
+    hset_many(ROUTES_KEY, entries)
+
+
+def _read_route_map():
+    rows = frappe.db.sql(
+        """
+        select name, item_code, route from `tabWebsite Item`
+        where published = 1
+        order by modified desc
+        """,
+        as_dict=True,
+    )
+    routes = {}
+    legacy = {}
+    for row in rows:
+        canonical = row.route or row.item_code
+        if row.route:
+            routes.setdefault(row.route, (row.name, canonical))
+        if row.item_code:
+            legacy.setdefault(row.item_code, (row.name, canonical))
+
+    # A real route always wins over an item_code that happens to look the same
+    mapping = dict(legacy, **routes)
+    mapping[BUILT_FIELD] = True
+    return mapping
+
+
+def get_item_detail(name):
+    cached = frappe.cache().hget(DETAIL_KEY, name)
+    if cached is not None and time.time() - cached.get("at", 0) < DETAIL_CACHE_TTL:
+        return cached["detail"]
+    detail = _build_item_detail(name)
+    if detail:
+        frappe.cache().hset(DETAIL_KEY, name, {"at": time.time(), "detail": detail})
+    return detail
+
+
+def clear_item_detail(doc, method=None):
+    # Cleared after commit; clearing earlier lets a concurrent request cache the old row again
+    name = doc.name
+    frappe.db.after_commit.add(lambda: frappe.cache().hdel(DETAIL_KEY, name))
+
+
+def _build_item_detail(name):
+    records = frappe.get_all(
+        "Website Item",
+        filters={"name": name},
+        fields=get_available_fields("Website Item", ITEM_FIELDS),
+        limit_page_length=1,
+    )
+    if not records:
+        return None
+
+    item = records[0]
+    specs = _get_specs(name)
+    return {
+        "item": frappe._dict({field: item.get(field) for field in ITEM_FIELDS}),
+        "gallery": _get_gallery(item, _get_child_rows(name, IMAGE_TABLE, ["image"])),
+        "specs": specs,
+        "highlights": _get_highlights(specs),
+    }
+
+
+def _get_child_rows(name, table_field, candidates):
+    child_doctype = get_child_doctype("Website Item", table_field)
+    if not child_doctype:
+        return []
+    fields = get_available_fields(child_doctype, candidates)
+    if not fields:
+        return []
+    return frappe.get_all(
+        child_doctype,
+        filters={"parent": name, "parenttype": "Website Item", "parentfield": table_field},
+        fields=fields,
+        order_by="idx asc",
+    )
+
+
+def _get_gallery(item, image_rows):
+    images = []
+    for field in ("website_image", "thumbnail", "image"):
+        value = item.get(field)
+        if value:
+            images.append(value)
+
+    for row in image_rows:
+        if row.get("image"):
+            images.append(row.image)
+
+    # de-duplicate while keeping order
+    seen = set()
+    unique = []
+    for img in images:
+        if img not in seen:
+            unique.append(img)
+            seen.add(img)
+    return unique
+
+
+def _get_specs(name):
+    specs = []
+    for row in _get_child_rows(name, SPECS_TABLE, ["label", "specification", "description", "value"]):
+        label = row.get("label") or row.get("specification")
+        value = row.get("description") or row.get("value")
+        if label or value:
+            specs.append({"label": label or "Detail", "value": value or ""})
+    return specs
+
+
+def _get_highlights(specs):
+    spec_map = {}
+    for spec in specs or []:
+        label = (spec.get("label") or "").strip().lower()
+        if not label:
+            continue
+        normalized = _normalize_label(label)
+        spec_map[normalized] = spec.get("value") or ""
+
+    def pick(keys, fallback):
+        for key in keys:
+            value = spec_map.get(_normalize_label(key))
+            if value:
+                return value
+        return fallback
+
+    return [
+        {
+            "label": "Materials",
+            "value": pick(["material", "materials", "plastic type"], "Varies by product"),
+        },
+        {
+            "label": "Capacity",
+            "value": pick(["capacity", "volume", "size"], "See specifications"),
+        },
+        {
+            "label": "Food-safe",
+            "value": pick(["food safe", "food-safe"], "Available on request"),
+        },
+        {
+            "label": "BPA-free",
+            "value": pick(["bpa free", "bpa-free"], "Available on request"),
+        },
+        {
+            "label": "Dishwasher-safe",
+            "value": pick(["dishwasher safe", "dishwasher-safe"], "Available on request"),
+        },
+    ]
+
+
+def _normalize_label(label):
+    return "".join(ch for ch in label.lower() if ch.isalnum())
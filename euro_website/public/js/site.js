@@ -80,6 +80,9 @@
                   ${(item.rate || 0).toFixed(2)}
                   <span class="cart-savings">You saved 12.5%</span>
                 </div>
+                ${item.in_stock === false || (item.available != null && item.qty > item.available)
+                  ? `<div class="stock-badge is-out">${item.in_stock === false ? "Out of stock" : `Only ${Math.max(0, Math.floor(item.available))} available`}</div>`
+                  : ""}
                 <div class="cart-actions">
                   <button class="qty-btn" data-cart-minus="${item.item_code}">−</button>
                   <span class="qty-value">${item.qty || 1}</span>
@@ -110,6 +113,66 @@
     }
   };
 
+  // localStorage mirrors the server cart for instant rendering; quantity changes are
+  // batched into one sync_cart call and the server answers with authoritative prices
+  const pendingCart = new Map();
+  let cartSyncTimer = null;
+  let cartSyncing = null;
+
+  const applyServerCart = (data) => {
+    // A newer batch is queued; its answer will carry the latest state
+    if (!data || !Array.isArray(data.items) || pendingCart.size) return;
+    saveCart(data.items);
+    renderCart();
+  };
+
+  const flushCartSync = async () => {
+    clearTimeout(cartSyncTimer);
+    if (cartSyncing) await cartSyncing;
+    if (!pendingCart.size) return true;
+
+    const changes = Array.from(pendingCart, ([item_code, qty]) => ({ item_code, qty }));
+    pendingCart.clear();
+    cartSyncing = call("euro_website.api.sync_cart", { changes: JSON.stringify(changes) })
+      .then((result) => {
+        applyServerCart(result.message || result);
+        return true;
+      })
+      .catch(() => {
+        changes.forEach((change) => {
+          if (!pendingCart.has(change.item_code)) pendingCart.set(change.item_code, change.qty);
+        });
+        return false;
+      });
+    const synced = await cartSyncing;
+    cartSyncing = null;
+    return synced;
+  };
+
+  const queueCartSync = (itemCode, qty) => {
+    pendingCart.set(itemCode, qty);
+    clearTimeout(cartSyncTimer);
+    cartSyncTimer = setTimeout(flushCartSync, 400);
+  };
+
+  const loadServerCart = async () => {
+    try {
+      const result = await call("euro_website.api.get_cart", {});
+      const data = result.message || result;
+      const local = getCart();
+      if (!data?.items?.length && local.length) {
+        // Carts saved before the server-side store, or by a guest who has just logged in
+        const changes = local.map((entry) => ({ item_code: entry.item_code, qty: entry.qty || 1 }));
+        const synced = await call("euro_website.api.sync_cart", { changes: JSON.stringify(changes), replace: 1 });
+        applyServerCart(synced.message || synced);
+        return;
+      }
+      applyServerCart(data);
+    } catch (error) {
+      // Keep showing the local copy
+    }
+  };
+
   const openCart = () => {
     document.querySelector(".cart-drawer")?.classList.add("is-open");
     document.querySelector(".cart-backdrop")?.classList.add("is-open");
@@ -136,19 +199,26 @@
     if (target?.dataset?.cartPlus) {
       const cart = getCart();
       const item = cart.find((entry) => entry.item_code === target.dataset.cartPlus);
-      if (item) item.qty += 1;
+      if (item) {
+        item.qty += 1;
+        queueCartSync(item.item_code, item.qty);
+      }
       saveCart(cart);
       renderCart();
     }
     if (target?.dataset?.cartMinus) {
       const cart = getCart();
       const item = cart.find((entry) => entry.item_code === target.dataset.cartMinus);
-      if (item) item.qty = Math.max(1, item.qty - 1);
+      if (item) {
+        item.qty = Math.max(1, item.qty - 1);
+        queueCartSync(item.item_code, item.qty);
+      }
       saveCart(cart);
       renderCart();
     }
     if (target?.dataset?.cartRemove) {
       const cart = getCart().filter((entry) => entry.item_code !== target.dataset.cartRemove);
+      queueCartSync(target.dataset.cartRemove, 0);
       saveCart(cart);
       renderCart();
     }
@@ -237,9 +307,10 @@
     });
   }
 
-  const addButtons = document.querySelectorAll("[data-add-to-cart]");
-  addButtons.forEach((button) => {
-    button.addEventListener("click", () => {
+  // Delegated so cards appended by the store's infinite scroll work too
+  document.addEventListener("click", (event) => {
+    const button = event.target.closest?.("[data-add-to-cart]");
+    if (button) {
       const itemCode = button.getAttribute("data-item-code");
       const itemName = button.getAttribute("data-item-name");
       const itemRoute = button.getAttribute("data-item-route");
@@ -248,28 +319,30 @@
       if (!itemCode) return;
 
       const cart = getCart();
-      const existing = cart.find((entry) => entry.item_code === itemCode);
+      let existing = cart.find((entry) => entry.item_code === itemCode);
       if (existing) {
         existing.qty += 1;
       } else {
-        cart.push({
+        existing = {
           item_code: itemCode,
           item_name: itemName || itemCode,
           route: itemRoute || itemCode,
           image: itemImage || "",
           rate: parseFloat(itemPrice) || 0,
           qty: 1,
-        });
+        };
+        cart.push(existing);
       }
+      queueCartSync(itemCode, existing.qty);
       saveCart(cart);
       renderCart();
       openCart();
-    });
+    }
   });
 
-  const addWishlistButtons = document.querySelectorAll("[data-add-to-wishlist]");
-  addWishlistButtons.forEach((button) => {
-    button.addEventListener("click", () => {
+  document.addEventListener("click", (event) => {
+    const button = event.target.closest?.("[data-add-to-wishlist]");
+    if (button) {
       const itemCode = button.getAttribute("data-item-code");
       const itemName = button.getAttribute("data-item-name");
       const itemRoute = button.getAttribute("data-item-route");
@@ -288,7 +361,7 @@
         localStorage.setItem(wishlistKey(), JSON.stringify(list));
       }
       button.textContent = "Saved";
-    });
+    }
   });
 
   const wishlistGrid = document.getElementById("wishlist-grid");
@@ -358,6 +431,18 @@
     if (totalEl) totalEl.textContent = cartTotal(cart).toFixed(2);
   }
 
+  const checkoutTokenKey = () => `euro_checkout_token:${getUserKey()}`;
+  const getCheckoutToken = () => {
+    let token = sessionStorage.getItem(checkoutTokenKey());
+    if (!token) {
+      token = window.crypto?.randomUUID
+        ? window.crypto.randomUUID()
+        : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+      sessionStorage.setItem(checkoutTokenKey(), token);
+    }
+    return token;
+  };
+
   const checkoutForm = document.getElementById("checkout-form");
   if (checkoutForm) {
     const stepper = checkoutForm.querySelectorAll(".step");
@@ -504,10 +589,13 @@
         payment_method: checkoutForm.payment_method.value,
         update_profile: checkoutForm.update_profile?.checked ? 1 : 0,
         update_address: checkoutForm.update_address?.checked ? 1 : 0,
-        items: cart,
+        idempotency_key: getCheckoutToken(),
       };
 
+      if (submitBtn) submitBtn.disabled = true;
       try {
+        // The server orders its stored cart; the local copy is only sent when it could not be synced
+        if (!(await flushCartSync())) payload.items = cart;
         const result = await call("euro_website.api.place_order", payload);
         const server = result.message || result;
         const ok = server?.ok || server?.sales_order;
@@ -515,6 +603,7 @@
           const orderId = server?.sales_order;
           saveAddressHistory({ address_line1: addressLine1, city, country });
           localStorage.removeItem(cartKey());
+          sessionStorage.removeItem(checkoutTokenKey());
           status.textContent = server.warning
             ? `Order placed: ${orderId}. Note: ${server.warning}`
             : `Order placed: ${orderId}`;
@@ -525,6 +614,8 @@
         }
       } catch (error) {
         status.textContent = error?.message || "Unable to place order. Please try again.";
+      } finally {
+        if (submitBtn) submitBtn.disabled = false;
       }
     });
   }
@@ -662,7 +753,140 @@
     });
   }
 
+  const stockBadges = document.querySelectorAll("[data-stock-badge]");
+  if (stockBadges.length) {
+    const codes = [...new Set([...stockBadges].map((el) => el.dataset.stockBadge))].slice(0, 200);
+    call("euro_website.api.get_stock", { item_codes: JSON.stringify(codes) })
+      .then((result) => {
+        const stock = result.message || result || {};
+        stockBadges.forEach((el) => {
+          const entry = stock[el.dataset.stockBadge];
+          if (!entry) return;
+          if (!("stockDetail" in el.dataset)) {
+            el.hidden = entry.in_stock;
+            return;
+          }
+          el.classList.toggle("is-out", !entry.in_stock);
+          if (!entry.in_stock) {
+            el.textContent = "Out of stock";
+          } else if (entry.qty != null && entry.qty < 10) {
+            el.textContent = `Only ${Math.floor(entry.qty)} left`;
+          } else {
+            el.textContent = "In stock";
+          }
+          el.hidden = false;
+        });
+      })
+      .catch(() => {});
+  }
+
+  const orderStatus = document.querySelector("[data-order-status]");
+  if (orderStatus && orderStatus.dataset.orderStatus) {
+    let attempts = 0;
+    const pollOrderStatus = async () => {
+      try {
+        const result = await call("euro_website.api.get_order_status", {
+          sales_order: orderStatus.dataset.orderStatus,
+        });
+        const data = result.message || result;
+        if (data?.status === "queued" && attempts < 20) {
+          attempts += 1;
+          orderStatus.textContent = "Confirming your order...";
+          setTimeout(pollOrderStatus, 1500);
+          return;
+        }
+        if (data?.status === "submitted") {
+          orderStatus.textContent = "Your order is confirmed.";
+        } else if (data?.status === "queued" || data?.status === "draft") {
+          orderStatus.textContent = "We received your order and will confirm it shortly.";
+        } else {
+          orderStatus.textContent = "";
+        }
+      } catch (error) {
+        orderStatus.textContent = "";
+      }
+    };
+    pollOrderStatus();
+  }
+
+  const portal = document.querySelector("[data-portal]");
+  if (portal) {
+    const escapeHtml = (value) =>
+      String(value ?? "").replace(/[&<>"']/g, (ch) => ({ "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" })[ch]);
+    const portalLists = {
+      orders: { method: "get_portal_orders", doctype: "Sales Order" },
+      invoices: { method: "get_portal_invoices", doctype: "Sales Invoice" },
+      payments: { method: "get_portal_payments", doctype: "Payment Entry" },
+    };
+
+    const renderPortalRow = (kind, row) => {
+      const list = portalLists[kind];
+      const status = row.status || "";
+      return `
+        <div class="portal-row">
+          <div>
+            <div class="row-title">${escapeHtml(row.name)}</div>
+            <a class="row-link" href="/printview?doctype=${encodeURIComponent(list.doctype)}&name=${encodeURIComponent(row.name)}&format=Standard&no_letterhead=0" target="_blank">Download</a>
+          </div>
+          <div>${escapeHtml(row.date_display)}</div>
+          <div><span class="status-badge status-${escapeHtml(status.toLowerCase().replace(/ /g, "-"))}">${escapeHtml(status)}</span></div>
+          <div>${escapeHtml(row.amount_display)}</div>
+        </div>
+      `;
+    };
+
+    const loadPortalPage = async (panel, reset) => {
+      const kind = panel.dataset.portalPanel;
+      const rows = panel.querySelector("[data-portal-rows]");
+      const more = panel.querySelector("[data-portal-more]");
+      const empty = panel.querySelector("[data-portal-empty]");
+      if (panel.dataset.loading) return;
+      panel.dataset.loading = "1";
+      if (more) more.disabled = true;
+      try {
+        const result = await call(`euro_website.api.${portalLists[kind].method}`, {
+          status: panel.querySelector("[data-portal-status]")?.value || "",
+          cursor: reset ? "" : panel.dataset.nextCursor || "",
+        });
+        const data = result.message || result || {};
+        const items = data.items || [];
+        const html = items.map((row) => renderPortalRow(kind, row)).join("");
+        if (reset) {
+          rows.innerHTML = html;
+        } else {
+          rows.insertAdjacentHTML("beforeend", html);
+        }
+        panel.dataset.nextCursor = data.next_cursor || "";
+        panel.dataset.loaded = "1";
+        if (more) more.hidden = !data.next_cursor;
+        if (empty) empty.hidden = Boolean(rows.children.length);
+      } catch (error) {
+        if (empty) empty.hidden = false;
+      } finally {
+        delete panel.dataset.loading;
+        if (more) more.disabled = false;
+      }
+    };
+
+    portal.querySelectorAll("[data-portal-tab]").forEach((tab) => {
+      tab.addEventListener("click", () => {
+        const kind = tab.dataset.portalTab;
+        portal.querySelectorAll("[data-portal-tab]").forEach((el) => el.classList.toggle("is-active", el === tab));
+        portal.querySelectorAll("[data-portal-panel]").forEach((panel) => {
+          panel.hidden = panel.dataset.portalPanel !== kind;
+          if (!panel.hidden && !panel.dataset.loaded) loadPortalPage(panel, true);
+        });
+      });
+    });
+
+    portal.querySelectorAll("[data-portal-panel]").forEach((panel) => {
+      panel.querySelector("[data-portal-more]")?.addEventListener("click", () => loadPortalPage(panel, false));
+      panel.querySelector("[data-portal-status]")?.addEventListener("change", () => loadPortalPage(panel, true));
+    });
+  }
+
   migrateLegacyStorage();
   renderCart();
+  loadServerCart();
   wishlistCount();
 })();
@@ -1 +1,85 @@
-// Reserved for store-specific interactions
+(function () {
+  const grid = document.querySelector("[data-store-grid]");
+  const sentinel = document.querySelector("[data-store-sentinel]");
+  if (!grid || !sentinel || !("IntersectionObserver" in window)) return;
+
+  const placeholder = "/assets/frappe/images/ui/placeholder-image.png";
+  const escapeHtml = (value) =>
+    String(value ?? "").replace(/[&<>"']/g, (ch) => ({ "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" })[ch]);
+
+  const renderCard = (item) => `
+    <div class="product-card">
+      <a href="/store/${escapeHtml(item.route)}">
+        <div class="product-media" style="background-image: url('${escapeHtml(item.image || placeholder)}')"></div>
+      </a>
+      <div class="product-body">
+        <div class="product-title">${escapeHtml(item.item_name)}</div>
+        <div class="product-price">${escapeHtml(item.price_display)}</div>
+        ${item.in_stock ? "" : `<div class="stock-badge is-out">Out of stock</div>`}
+        ${item.review_count ? `<div class="product-rating">${escapeHtml(item.rating)}/5 <span class="muted">(${escapeHtml(item.review_count)})</span></div>` : ""}
+        <div class="product-cta">View details</div>
+        <div class="card-actions">
+          <button class="btn btn-solid btn-small" type="button"
+            data-add-to-cart
+            data-item-code="${escapeHtml(item.item_code)}"
+            data-item-name="${escapeHtml(item.item_name)}"
+            data-item-route="${escapeHtml(item.route)}"
+            data-item-image="${escapeHtml(item.image)}"
+            data-item-price="${escapeHtml(item.price)}">
+            Add to cart
+          </button>
+          <button class="btn btn-ghost btn-small" type="button"
+            data-add-to-wishlist
+            data-item-code="${escapeHtml(item.item_code)}"
+            data-item-name="${escapeHtml(item.item_name)}"
+            data-item-route="${escapeHtml(item.route)}"
+            data-item-image="${escapeHtml(item.image)}">
+            Save
+          </button>
+        </div>
+      </div>
+    </div>
+  `;
+
+  // Infinite scroll replaces the pager once JS is available
+  document.querySelectorAll(".pager").forEach((pager) => {
+    pager.style.display = "none";
+  });
+
+  let cursor = sentinel.dataset.nextCursor;
+  let page = Number(sentinel.dataset.nextPage) || 2;
+  let loading = false;
+
+  const loadMore = async () => {
+    if (loading || !cursor) return;
+    loading = true;
+    const params = new URLSearchParams(grid.dataset.storeQuery || "");
+    params.set("page", page);
+    params.set("cursor", cursor);
+    try {
+      const response = await fetch(`/api/method/euro_website.api.get_products?${params}`, {
+        credentials: "same-origin",
+      });
+      const result = await response.json();
+      const data = result.message || {};
+      grid.insertAdjacentHTML("beforeend", (data.items || []).map(renderCard).join(""));
+      cursor = data.next_cursor;
+      page += 1;
+    } catch (error) {
+      cursor = null;
+    }
+    loading = false;
+    if (!cursor) {
+      observer.disconnect();
+      sentinel.remove();
+    }
+  };
+
+  const observer = new IntersectionObserver(
+    (entries) => {
+      if (entries.some((entry) => entry.isIntersecting)) loadMore();
+    },
+    { rootMargin: "400px 0px" }
+  );
+  observer.observe(sentinel);
+})();
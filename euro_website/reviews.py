@@ -0,0 +1,134 @@
+import frappe
+
+from euro_website.cache import hget_many, hset_many
+
+SUMMARY_KEY = "euro_website:review_summary"
+TOP_REVIEWS_KEY = "euro_website:top_reviews"
+TOP_REVIEWS_LIMIT = 6
+# Item Review.rating is a Rating field stored as a 0-1 fraction; the site shows stars out of 5
+MAX_STARS = 5
+REVIEW_FIELDS = ["customer_name", "rating", "review", "creation"]
+
+
+def get_review_summaries(item_codes):
+    codes = list(dict.fromkeys(code for code in item_codes or [] if code))
+    if not codes:
+        return {}
+
+    summaries = hget_many(SUMMARY_KEY, codes)
+    missing = [code for code in codes if code not in summaries]
+    if missing:
+        fetched = _fetch_summaries(missing)
+        hset_many(SUMMARY_KEY, fetched)
+        summaries.update(fetched)
+    return {code: _with_average(summary) for code, summary in summaries.items()}
+
+
+def get_review_summary(item_code):
+    return get_review_summaries([item_code]).get(item_code) or _with_average(_empty_summary())
+
+
+def get_top_reviews(item_code):
+    reviews = frappe.cache().hget(TOP_REVIEWS_KEY, item_code)
+    if reviews is None:
+        reviews = _fetch_top_reviews(item_code)
+        frappe.cache().hset(TOP_REVIEWS_KEY, item_code, reviews)
+    return reviews
+
+
+def clear_review_cache():
+    frappe.cache().delete_value([SUMMARY_KEY, TOP_REVIEWS_KEY])
+
+
+def on_review_insert(doc, method=None):
+    _refresh_after_commit(doc.get("item_code"))
+
+
+def on_review_update(doc, method=None):
+    previous = doc.get_doc_before_save()
+    if not previous:
+        # New reviews are counted by after_insert
+        return
+    codes = [doc.get("item_code")]
+    if previous.get("item_code") != doc.get("item_code"):
+        codes.append(previous.get("item_code"))
+    _refresh_after_commit(*codes)
+
+
+def on_review_trash(doc, method=None):
+    _refresh_after_commit(doc.get("item_code"))
+
+
+def _refresh_after_commit(*item_codes):
+    # Recounting committed rows keeps concurrent saves and rolled-back inserts from skewing the summary
+    codes = [code for code in item_codes if code]
+    if codes:
+        frappe.db.after_commit.add(lambda: _refresh_summaries(codes))
+
+
+def _refresh_summaries(codes):
+    hset_many(SUMMARY_KEY, _fetch_summaries(codes))
+    for code in codes:
+        frappe.cache().hdel(TOP_REVIEWS_KEY, code)
+
+
+def _fetch_summaries(codes):
+    summaries = {code: _empty_summary() for code in codes}
+    if not _has_reviews():
+        return summaries
+
+    rows = frappe.db.sql(
+        """
+        select item_code, rating, count(*) as count
+        from `tabItem Review`
+        where item_code in %(codes)s
+        group by item_code, rating
+        """,
+        {"codes": tuple(codes)},
+        as_dict=True,
+    )
+    for row in rows:
+        summary = summaries[row.item_code]
+        stars = _to_stars(row.rating)
+        summary["count"] += row.count
+        summary["total"] += stars * row.count
+        summary["histogram"][_bucket(stars) - 1] += row.count
+    return summaries
+
+
+def _fetch_top_reviews(item_code):
+    if not _has_reviews():
+        return []
+    reviews = frappe.get_all(
+        "Item Review",
+        filters={"item_code": item_code},
+        fields=REVIEW_FIELDS,
+        order_by="creation desc",
+        limit_page_length=TOP_REVIEWS_LIMIT,
+    )
+    for review in reviews:
+        review.rating = round(_to_stars(review.rating), 1)
+    return reviews
+
+
+def _has_reviews():
+    # table_exists reads Frappe's cached table list instead of querying DocType
+    return frappe.db.table_exists("Item Review")
+
+
+def _empty_summary():
+    # histogram[i] counts reviews rounded to i + 1 stars
+    return {"count": 0, "total": 0.0, "histogram": [0, 0, 0, 0, 0]}
+
+
+def _with_average(summary):
+    average = summary["total"] / summary["count"] if summary["count"] else 0
+    return dict(summary, average=round(average, 1))
+
+
+def _to_stars(rating):
+    return frappe.utils.flt(rating) * MAX_STARS
+
+
+def _bucket(stars):
+    return min(MAX_STARS, max(1, int(stars + 0.5)))
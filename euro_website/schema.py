@@ -0,0 +1,57 @@
+import frappe
+
+VERSION_KEY = "euro_website:schema_version"
+STANDARD_FIELDS = ("name", "owner", "creation", "modified", "modified_by")
+
+# site -> {"version": ..., "fieldnames": {doctype: set}, "projections": {(doctype, candidates): list},
+#          "tables": {(doctype, fieldname): child doctype}}
+_schemas = {}
+
+
+def get_available_fields(doctype, candidates):
+    schema = _get_schema()
+    key = (doctype, tuple(candidates))
+    if key not in schema["projections"]:
+        allowed = _get_fieldnames(schema, doctype)
+        schema["projections"][key] = [field for field in candidates if field in allowed]
+    return list(schema["projections"][key])
+
+
+def has_field(doctype, fieldname):
+    return fieldname in _get_fieldnames(_get_schema(), doctype)
+
+
+def get_child_doctype(doctype, fieldname):
+    schema = _get_schema()
+    key = (doctype, fieldname)
+    if key not in schema["tables"]:
+        field = frappe.get_meta(doctype).get_field(fieldname)
+        is_table = field and field.fieldtype in ("Table", "Table MultiSelect")
+        schema["tables"][key] = field.options if is_table else None
+    return schema["tables"][key]
+
+
+def clear_schema_cache(doc=None, method=None):
+    frappe.cache().set_value(VERSION_KEY, frappe.generate_hash(length=12))
+
+
+def _get_fieldnames(schema, doctype):
+    if doctype not in schema["fieldnames"]:
+        meta = frappe.get_meta(doctype)
+        fieldnames = [df.fieldname for df in meta.fields if df.fieldname]
+        schema["fieldnames"][doctype] = set(fieldnames).union(STANDARD_FIELDS)
+    return schema["fieldnames"][doctype]
+
+
+def _get_schema():
+    # Redis is consulted once per request to see whether another process changed the schema
+    version = getattr(frappe.local, "euro_website_schema_version", None)
+    if version is None:
+        version = frappe.cache().get_value(VERSION_KEY) or ""
+        frappe.local.euro_website_schema_version = version
+
+    site = frappe.local.site
+    schema = _schemas.get(site)
+    if not schema or schema["version"] != version:
+        schema = _schemas[site] = {"version": version, "fieldnames": {}, "projections": {}, "tables": {}}
+    return schema
@@ -0,0 +1,244 @@
+import bisect
+import re
+import threading
+
+import frappe
+
+from euro_website.cache import hget_many, hset_many
+from euro_website.schema import get_available_fields
+
+DOCS_KEY = "euro_website:search_docs"
+# Changes on every full rebuild; per-item saves only append to the change log
+VERSION_KEY = "euro_website:search_version"
+# "<seq>|<website item>" per save, so workers patch their index instead of reloading all of it
+CHANGES_KEY = "euro_website:search_changes"
+SEQUENCE_KEY = "euro_website:search_sequence"
+CHANGE_LOG_LENGTH = 1000
+
+# Weight of a token by the field it was found in; a token keeps its best weight
+FIELD_WEIGHTS = (
+    ("item_name", 4),
+    ("item_code", 4),
+    ("website_description", 2),
+    ("web_long_description", 1),
+    ("description", 1),
+)
+EXACT_MATCH_BONUS = 2
+
+# \w keeps umlauts and ß inside words
+_TOKEN_RE = re.compile(r"\w+")
+
+# site -> [version, sequence, SearchIndex]; reloaded when the version moves, patched when the sequence does
+_indexes = {}
+_lock = threading.Lock()
+
+
+class SearchIndex:
+    def __init__(self, docs):
+        self.docs = docs
+        self.postings = {}
+        for name, entry in docs.items():
+            for token, weight in entry["tokens"].items():
+                self.postings.setdefault(token, {})[name] = weight
+        self.vocabulary = sorted(self.postings)
+
+    def update(self, name, entry):
+        previous = self.docs.pop(name, None)
+        for token in previous["tokens"] if previous else ():
+            postings = self.postings[token]
+            postings.pop(name, None)
+            if not postings:
+                del self.postings[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+        if entry is None:
+            return
+        self.docs[name] = entry
+        for token, weight in entry["tokens"].items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+            self.postings[token][name] = weight
+
+    def expand(self, term):
+        tokens = []
+        start = bisect.bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            tokens.append(token)
+        return tokens
+
+    def search(self, query, category=None, min_price=None, max_price=None):
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token in self.expand(term):
+                bonus = EXACT_MATCH_BONUS if token == term else 1
+                for name, weight in self.postings[token].items():
+                    score = weight * bonus
+                    if score > term_scores.get(name, 0):
+                        term_scores[name] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {name: scores[name] + score for name, score in term_scores.items() if name in scores}
+            if not scores:
+                return []
+
+        ranked = []
+        for name, score in scores.items():
+            entry = self.docs[name]
+            if category and entry.get("item_group") != category:
+                continue
+            rate = entry.get("standard_rate") or 0
+            if min_price is not None and rate < min_price:
+                continue
+            if max_price is not None and rate > max_price:
+                continue
+            ranked.append((-score, -entry.get("modified", 0), name))
+        ranked.sort()
+        return [name for _, _, name in ranked]
+
+
+def tokenize(text):
+    if not text:
+        return []
+    text = frappe.utils.strip_html(str(text)).lower()
+    return _TOKEN_RE.findall(text)
+
+
+def search_website_items(query, filters=None, start=0, page_length=20):
+    filters = filters or {}
+    try:
+        index = get_index()
+    except Exception:
+        return None
+
+    # Threads of one worker share the index and get_index patches it in place
+    with _lock:
+        names = index.search(
+            query,
+            category=filters.get("category"),
+            min_price=filters.get("min_price"),
+            max_price=filters.get("max_price"),
+        )
+    return names[start : start + page_length], len(names)
+
+
+def get_index():
+    cache = frappe.cache()
+    version = cache.get_value(VERSION_KEY)
+    if not version:
+        version = rebuild_index()
+    sequence = int(cache.get(cache.make_key(SEQUENCE_KEY)) or 0)
+
+    site = frappe.local.site
+    state = _indexes.get(site)
+    if state and state[0] == version:
+        if state[1] == sequence or _apply_changes(state, sequence):
+            return state[2]
+
+    # The sequence is read before the hash, so a save racing this load is replayed next time
+    docs = {_to_str(name): entry for name, entry in (cache.hgetall(DOCS_KEY) or {}).items()}
+    index = SearchIndex(docs)
+    _indexes[site] = [version, sequence, index]
+    return index
+
+
+def _apply_changes(state, sequence):
+    cache = frappe.cache()
+    logged = {}
+    for change in cache.lrange(cache.make_key(CHANGES_KEY), 0, -1):
+        seq, name = _to_str(change).split("|", 1)
+        logged[int(seq)] = name
+    missing = [seq for seq in range(state[1] + 1, sequence + 1) if seq not in logged]
+    if missing:
+        # Trimmed past what this worker has seen, or a save between its incr and rpush
+        return False
+
+    names = list({logged[seq] for seq in range(state[1] + 1, sequence + 1)})
+    entries = hget_many(DOCS_KEY, names)
+    with _lock:
+        for name in names:
+            state[2].update(name, entries.get(name))
+        state[1] = max(state[1], sequence)
+    return True
+
+
+def rebuild_index():
+    fields = get_available_fields("Website Item", _index_fields())
+    records = frappe.get_all("Website Item", filters={"published": 1}, fields=fields)
+
+    cache = frappe.cache()
+    cache.delete_value(DOCS_KEY)
+    cache.delete(cache.make_key(CHANGES_KEY))
+    hset_many(DOCS_KEY, {record.name: _build_entry(record) for record in records})
+    return _bump_version()
+
+
+def update_index(doc, method=None):
+    if not _index_exists():
+        return
+    if doc.get("published"):
+        frappe.cache().hset(DOCS_KEY, doc.name, _build_entry(doc))
+    else:
+        frappe.cache().hdel(DOCS_KEY, doc.name)
+    _log_change(doc.name)
+
+
+def remove_from_index(doc, method=None):
+    if not _index_exists():
+        return
+    frappe.cache().hdel(DOCS_KEY, doc.name)
+    _log_change(doc.name)
+
+
+def _log_change(name):
+    cache = frappe.cache()
+    sequence = cache.incr(cache.make_key(SEQUENCE_KEY))
+    key = cache.make_key(CHANGES_KEY)
+    cache.rpush(key, f"{sequence}|{name}")
+    cache.ltrim(key, -CHANGE_LOG_LENGTH, -1)
+
+
+def _index_exists():
+    # Patching a flushed or evicted hash would leave a partial index; let the next read rebuild it instead
+    cache = frappe.cache()
+    if cache.get_value(VERSION_KEY) and cache.hlen(cache.make_key(DOCS_KEY)):
+        return True
+    cache.delete_value(VERSION_KEY)
+    return False
+
+
+def _build_entry(record):
+    tokens = {}
+    for field, weight in FIELD_WEIGHTS:
+        for token in tokenize(record.get(field)):
+            if weight > tokens.get(token, 0):
+                tokens[token] = weight
+    modified = frappe.utils.get_datetime(record.get("modified")) if record.get("modified") else None
+    return {
+        "item_code": record.get("item_code"),
+        "item_group": record.get("item_group"),
+        "standard_rate": frappe.utils.flt(record.get("standard_rate")),
+        "modified": modified.timestamp() if modified else 0,
+        "tokens": tokens,
+    }
+
+
+def _bump_version():
+    version = frappe.generate_hash(length=12)
+    frappe.cache().set_value(VERSION_KEY, version)
+    return version
+
+
+def _index_fields():
+    return ["name", "modified", "item_group", "standard_rate"] + [field for field, _ in FIELD_WEIGHTS]
+
+
+def _to_str(value):
+    return value.decode() if isinstance(value, bytes) else value
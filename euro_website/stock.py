@@ -0,0 +1,63 @@
+import time
+
+import frappe
+
+from euro_website.cache import hget_many, hset_many
+from euro_website.warehouse import get_default_company, get_item_warehouses
+
+STOCK_KEY = "euro_website:stock:{}"
+# Entries older than this are re-read from Bin even without a stock movement
+STOCK_CACHE_TTL = 60
+
+
+def get_stock_availability(item_codes, company=None):
+    codes = list(dict.fromkeys(code for code in item_codes or [] if code))
+    if not codes:
+        return {}
+
+    company = company or get_default_company()
+    key = STOCK_KEY.format(company or "")
+    now = time.time()
+    entries = {
+        code: entry for code, entry in hget_many(key, codes).items() if now - entry["at"] < STOCK_CACHE_TTL
+    }
+    missing = [code for code in codes if code not in entries]
+    if missing:
+        fetched = _fetch_stock(missing, company, now)
+        hset_many(key, fetched)
+        entries.update(fetched)
+    return {code: {field: entries[code][field] for field in ("qty", "in_stock", "warehouse")} for code in codes}
+
+
+def clear_stock_cache(doc, method=None):
+    # Stock Ledger Entries carry one item; Sales Orders change reserved qty for all their lines
+    item_codes = [doc.get("item_code")] if doc.get("item_code") else [row.item_code for row in doc.get("items") or []]
+    key = STOCK_KEY.format(doc.get("company") or "")
+    for code in set(item_codes):
+        frappe.cache().hdel(key, code)
+
+
+def _fetch_stock(codes, company, now):
+    warehouses = get_item_warehouses(codes, company)
+    rows = frappe.db.sql(
+        """
+        select item.item_code, item.is_stock_item, bin.warehouse,
+            sum(coalesce(bin.actual_qty, 0) - coalesce(bin.reserved_qty, 0)) as qty
+        from `tabItem` item
+        left join `tabBin` bin on bin.item_code = item.item_code and bin.warehouse in %(warehouses)s
+        where item.item_code in %(codes)s
+        group by item.item_code, item.is_stock_item, bin.warehouse
+        """,
+        {"codes": tuple(codes), "warehouses": tuple(set(filter(None, warehouses.values()))) or ("",)},
+        as_dict=True,
+    )
+
+    entries = {code: {"qty": 0, "in_stock": False, "warehouse": warehouses.get(code), "at": now} for code in codes}
+    for row in rows:
+        entry = entries[row.item_code]
+        if not row.is_stock_item:
+            # Services and other non-stock items can always be sold
+            entry.update(qty=None, in_stock=True)
+        elif row.warehouse and row.warehouse == entry["warehouse"]:
+            entry.update(qty=frappe.utils.flt(row.qty), in_stock=frappe.utils.flt(row.qty) > 0)
+    return entries
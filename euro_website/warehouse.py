@@ -0,0 +1,116 @@
+import frappe
+
+from euro_website.cache import hget_many, hset_many
+from euro_website.schema import has_field
+
+WAREHOUSES_KEY = "euro_website:warehouses:{}"
+DEFAULT_FIELD = "::company_default"
+
+
+def get_item_warehouses(item_codes, company):
+    codes = list(dict.fromkeys(code for code in item_codes if code))
+    if not codes:
+        return {}
+
+    key = WAREHOUSES_KEY.format(company or "")
+    warehouses = hget_many(key, codes)
+    missing = [code for code in codes if code not in warehouses]
+    if missing:
+        resolved = _resolve_item_warehouses(missing, company, key)
+        hset_many(key, resolved)
+        warehouses.update(resolved)
+    return {code: warehouses.get(code) for code in codes}
+
+
+def get_default_company():
+    company = frappe.defaults.get_global_default("company")
+    if not company:
+        companies = frappe.get_all("Company", fields=["name"], limit_page_length=1)
+        company = companies[0].name if companies else None
+    return company
+
+
+def clear_warehouse_cache(doc=None, method=None):
+    frappe.cache().delete_keys(WAREHOUSES_KEY.format(""))
+
+
+def clear_item_warehouse_cache(doc, method=None):
+    for company in [""] + frappe.get_all("Company", pluck="name"):
+        frappe.cache().hdel(WAREHOUSES_KEY.format(company), doc.name)
+
+
+def _resolve_item_warehouses(codes, company, key):
+    candidates = {code: [] for code in codes}
+    if has_field("Item", "default_warehouse"):
+        for row in frappe.get_all("Item", filters={"name": ["in", codes]}, fields=["name", "default_warehouse"]):
+            if row.default_warehouse:
+                candidates[row.name].append(row.default_warehouse)
+
+    if frappe.db.exists("DocType", "Item Default"):
+        for row in frappe.get_all(
+            "Item Default",
+            filters={"parent": ["in", codes], "parenttype": "Item"},
+            fields=["parent", "default_warehouse"],
+            order_by="idx asc",
+        ):
+            if row.default_warehouse and row.parent in candidates:
+                candidates[row.parent].append(row.default_warehouse)
+
+    warehouses = {warehouse for rows in candidates.values() for warehouse in rows}
+    companies = _get_warehouse_companies(warehouses)
+
+    default = _get_company_default(company, key)
+    return {
+        code: next((wh for wh in candidates[code] if _belongs(wh, company, companies)), None) or default
+        for code in codes
+    }
+
+
+def _get_company_default(company, key):
+    cached = hget_many(key, [DEFAULT_FIELD])
+    if DEFAULT_FIELD in cached:
+        return cached[DEFAULT_FIELD]
+
+    fallbacks = _get_company_fallbacks(company)
+    companies = _get_warehouse_companies(fallbacks)
+    default = next((wh for wh in fallbacks if _belongs(wh, company, companies)), None)
+    if not default:
+        default = _get_any_warehouse(company)
+    hset_many(key, {DEFAULT_FIELD: default})
+    return default
+
+
+def _belongs(warehouse, company, companies):
+    if not company:
+        return True
+    owner = companies.get(warehouse)
+    return not owner or owner == company
+
+
+def _get_company_fallbacks(company):
+    fallbacks = []
+    if company and has_field("Company", "default_warehouse"):
+        fallbacks.append(frappe.db.get_value("Company", company, "default_warehouse"))
+    fallbacks.append(frappe.db.get_single_value("Stock Settings", "default_warehouse"))
+    return [warehouse for warehouse in fallbacks if warehouse]
+
+
+def _get_warehouse_companies(warehouses):
+    warehouses = [warehouse for warehouse in warehouses if warehouse]
+    if not warehouses:
+        return {}
+    records = frappe.get_all("Warehouse", filters={"name": ["in", warehouses]}, fields=["name", "company"])
+    return {record.name: record.company for record in records}
+
+
+def _get_any_warehouse(company):
+    fallback = frappe.get_all(
+        "Warehouse",
+        filters={"company": company} if company else None,
+        fields=["name"],
+        limit_page_length=1,
+    )
+    if fallback:
+        return fallback[0].name
+    fallback_any = frappe.get_all("Warehouse", fields=["name"], limit_page_length=1)
+    return fallback_any[0].name if fallback_any else None
@@ -1,5 +1,18 @@
 import frappe
 
+from euro_website import search
+from euro_website.categories import CATEGORY_SUBQUERY, get_category_counts
+from euro_website.cursor import decode_cursor, encode_cursor
+from euro_website.customer import get_customer, get_price_list
+from euro_website.page_cache import get_fragment
+from euro_website.pricing import get_item_prices
+from euro_website.reviews import get_review_summaries
+from euro_website.stock import get_stock_availability
+from euro_website.schema import get_available_fields
+
+# Listings stop counting past this many matches and show "1000+" instead
+TOTAL_COUNT_CAP = 1000
+
 
 def get_context(context):
     context.no_cache = 1
@@ -9,19 +22,70 @@ def get_context(context):
     page, page_size = _get_paging()
     context.page = page
     context.page_size = page_size
-    context.categories = _get_categories()
-    context.category_chips = _build_category_chips(filters, context.categories)
+    category_counts = get_category_counts()
+    context.categories = sorted(category_counts)
+    context.category_chips = _build_category_chips(filters, category_counts)
     context.base_query_string = _build_base_query(filters, page_size)
-    price_list = _get_price_list()
+    price_list = get_price_list()
     context.price_list = price_list
-    products, total = _get_products(filters, page, page_size)
+    cursor = frappe.form_dict.get("cursor")
+    products, total, next_cursor = _get_product_rows(filters, page, page_size, cursor)
     _attach_prices(products, price_list)
+    _attach_ratings(products)
+    # Stock badges are filled in by site.js so the cached page survives stock movements
     context.products = products
     context.total_products = total
-    context.total_pages = max(1, (total + page_size - 1) // page_size)
+    context.total_capped = total > TOTAL_COUNT_CAP
+    context.total_label = f"{TOTAL_COUNT_CAP}+" if context.total_capped else str(total)
+    if context.total_capped:
+        # The real page count is unknown past the cap; only promise the next page
+        context.total_pages = page + 1 if next_cursor else page
+    else:
+        context.total_pages = max(1, (total + page_size - 1) // page_size)
+    context.next_cursor = next_cursor
+    context.next_query_string = _build_next_query(context.base_query_string, page, next_cursor)
     context.cart = {"items": []}
 
 
+def get_product_page():
+    filters = _get_filters()
+    page, page_size = _get_paging()
+    cursor = frappe.form_dict.get("cursor")
+    # Follow-up pages skip the count; the first page already reported it
+    products, total, next_cursor = _get_product_rows(filters, page, page_size, cursor, with_count=not cursor)
+    _attach_prices(products, get_price_list())
+    _attach_ratings(products)
+    _attach_stock(products)
+    return {
+        "items": [_serialize_card(item) for item in products],
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+
+
+def _get_product_rows(filters, page, page_size, cursor, with_count=True):
+    key = f"{_build_base_query(filters, page_size)}&page={page}&cursor={cursor or ''}&count={int(with_count)}"
+    return get_fragment(
+        "store_grid",
+        key,
+        lambda: _get_products(filters, page, page_size, cursor=cursor, with_count=with_count),
+    )
+
+
+def _serialize_card(item):
+    return {
+        "item_code": item.item_code,
+        "item_name": item.item_name,
+        "route": item.get("route") or item.item_code,
+        "image": item.get("thumbnail") or item.get("website_image") or "",
+        "price": item.price or 0,
+        "price_display": frappe.utils.fmt_money(item.price or 0),
+        "rating": item.rating,
+        "review_count": item.review_count,
+        "in_stock": item.in_stock,
+    }
+
+
 def _get_filters():
     form = frappe.form_dict
     return {
@@ -63,7 +127,14 @@ def _build_base_query(filters, page_size):
     return frappe.utils.urlencode(_clean_query(query))
 
 
-def _build_category_chips(filters, categories):
+def _build_next_query(base_query_string, page, next_cursor):
+    if not next_cursor:
+        return None
+    query = frappe.utils.urlencode({"page": page + 1, "cursor": next_cursor})
+    return f"{base_query_string}&{query}" if base_query_string else query
+
+
+def _build_category_chips(filters, category_counts):
     chips = []
     base = _clean_query(
         {
@@ -75,16 +146,18 @@ def _build_category_chips(filters, categories):
     chips.append(
         {
             "label": "All",
+            "count": sum(category_counts.values()),
             "query": frappe.utils.urlencode(base),
             "active": not filters.get("category"),
         }
     )
-    for cat in categories:
+    for cat in sorted(category_counts):
         query = dict(base)
         query["category"] = cat
         chips.append(
             {
                 "label": cat,
+                "count": category_counts[cat],
                 "query": frappe.utils.urlencode(query),
                 "active": filters.get("category") == cat,
             }
@@ -96,33 +169,12 @@ def _clean_query(query):
     return {key: value for key, value in query.items() if value not in (None, "")}
 
 
-def _get_products(filters, page, page_size):
-    data_filters = {"published": 1}
-    if filters.get("min_price") is not None and filters.get("max_price") is not None:
-        data_filters["standard_rate"] = ["between", [filters.get("min_price") or 0, filters["max_price"]]]
-    elif filters.get("min_price") is not None:
-        data_filters["standard_rate"] = [">=", filters["min_price"]]
-    elif filters.get("max_price") is not None:
-        data_filters["standard_rate"] = ["<=", filters["max_price"]]
-
-    or_filters = []
-    if filters.get("q"):
-        q = f"%{filters['q']}%"
-        or_filters = [
-            ["item_name", "like", q],
-            ["website_description", "like", q],
-            ["web_long_description", "like", q],
-        ]
-
-    if filters.get("category"):
-        item_codes = _get_item_codes_by_category(filters["category"])
-        if not item_codes:
-            return [], 0
-        data_filters["item_code"] = ["in", item_codes]
-
-    fields = _available_fields(
+def _get_products(filters, page, page_size, cursor=None, with_count=True):
+    fields = get_available_fields(
         "Website Item",
         [
+            "name",
+            "modified",
             "item_code",
             "item_name",
             "route",
@@ -134,27 +186,115 @@ def _get_products(filters, page, page_size):
             "standard_rate",
         ],
     )
-    items = frappe.get_all(
+    position = decode_cursor(cursor) or {}
+    start = (page - 1) * page_size
+
+    if filters.get("q"):
+        # Search results are ranked, so their cursor is an offset into the ranking
+        start = frappe.utils.cint(position.get("offset")) if "offset" in position else start
+        found = search.search_website_items(filters["q"], filters, start=start, page_length=page_size)
+        if found is not None:
+            names, total = found
+            next_cursor = encode_cursor({"offset": start + page_size}) if start + page_size < total else None
+            return _get_items_by_name(names, fields), total, next_cursor
+
+    conditions, values = _build_conditions(filters)
+    after = position if "modified" in position and "name" in position else None
+    items, total = _query_page(fields, conditions, values, start, page_size, after=after, with_count=with_count)
+
+    next_cursor = None
+    seen = (page - 1) * page_size + len(items)
+    # A capped total only says "more than TOTAL_COUNT_CAP", so a full page means there may be more
+    more = total is None or total > TOTAL_COUNT_CAP or seen < total
+    if len(items) == page_size and more:
+        last = items[-1]
+        next_cursor = encode_cursor({"modified": last.modified, "name": last.name})
+    return items, total, next_cursor
+
+
+def _build_conditions(filters):
+    conditions = ["published = 1"]
+    values = {}
+    if filters.get("min_price") is not None:
+        conditions.append("standard_rate >= %(min_price)s")
+        values["min_price"] = filters["min_price"]
+    if filters.get("max_price") is not None:
+        conditions.append("standard_rate <= %(max_price)s")
+        values["max_price"] = filters["max_price"]
+
+    if filters.get("q"):
+        # Search index unavailable, fall back to scanning the table
+        conditions.append(
+            "(item_name like %(q)s or website_description like %(q)s or web_long_description like %(q)s)"
+        )
+        values["q"] = f"%{filters['q']}%"
+
+    if filters.get("category"):
+        conditions.append(f"item_code in ({CATEGORY_SUBQUERY})")
+        values["category"] = filters["category"]
+    return conditions, values
+
+
+def _query_page(fields, conditions, values, start, page_length, after=None, with_count=True):
+    # Page rows and a capped match count in one round trip; the count
+    # subquery stops scanning once it has seen more than TOTAL_COUNT_CAP rows.
+    # With a cursor the page seeks past (modified, name) instead of using an offset.
+    where = " and ".join(conditions)
+    row_where = where
+    values = dict(values, start=start, page_length=page_length, count_limit=TOTAL_COUNT_CAP + 1)
+    if after:
+        row_where = f"{where} and (modified < %(after_modified)s or (modified = %(after_modified)s and name < %(after_name)s))"
+        values.update(after_modified=after["modified"], after_name=after["name"], start=0)
+
+    columns = ", ".join(f"`{field}`" for field in fields)
+    count_column = ""
+    if with_count:
+        count_column = f""",
+            (select count(*) from (
+                select 1 from `tabWebsite Item` where {where} limit %(count_limit)s
+            ) matches) as total_count"""
+    items = frappe.db.sql(
+        f"""
+        select {columns}{count_column}
+        from `tabWebsite Item`
+        where {row_where}
+        order by modified desc, name desc
+        limit %(page_length)s offset %(start)s
+        """,
+        values,
+        as_dict=True,
+    )
+    if not with_count:
+        return items, None
+    if items:
+        total = items[0].total_count
+        for item in items:
+            item.pop("total_count", None)
+        return items, total
+
+    if not start and not after:
+        return [], 0
+    total = frappe.db.sql(
+        f"""
+        select count(*) from (
+            select 1 from `tabWebsite Item` where {where} limit %(count_limit)s
+        ) matches
+        """,
+        values,
+    )[0][0]
+    return [], total
+
+
+def _get_items_by_name(names, fields):
+    if not names:
+        return []
+    records = frappe.get_all(
         "Website Item",
-        filters=data_filters,
-        or_filters=or_filters,
-        fields=fields,
-        order_by="modified desc",
-        limit_start=(page - 1) * page_size,
-        limit_page_length=page_size,
+        filters={"name": ["in", names]},
+        fields=list(dict.fromkeys(["name"] + fields)),
     )
-    if or_filters:
-        total = len(
-            frappe.get_all(
-                "Website Item",
-                filters=data_filters,
-                or_filters=or_filters,
-                fields=["name"],
-            )
-        )
-    else:
-        total = frappe.db.count("Website Item", filters=data_filters)
-    return items, total
+    by_name = {record.name: record for record in records}
+    return [by_name[name] for name in names if name in by_name]
 
 
 def _get_item_groups(items):
@@ -170,100 +310,30 @@ def _get_item_groups(items):
     return {record.item_code: record.item_group for record in records}
 
 
-def _get_categories():
-    records = frappe.get_all(
-        "Item",
-        filters={"published_in_website": 1},
-        fields=["item_group"],
-        limit_page_length=500,
-    )
-    return sorted({row.item_group for row in records if row.item_group})
-
-
-def _get_item_codes_by_category(category):
-    records = frappe.get_all(
-        "Item",
-        filters={"published_in_website": 1, "item_group": category},
-        fields=["item_code"],
-        limit_page_length=1000,
-    )
-    return [row.item_code for row in records if row.item_code]
-
-
-def _available_fields(doctype, candidates):
-    meta = frappe.get_meta(doctype)
-    if hasattr(meta, "get_fieldnames"):
-        fieldnames = meta.get_fieldnames()
-    else:
-        fieldnames = [df.fieldname for df in meta.fields if df.fieldname]
-    allowed = set(fieldnames + ["name", "owner", "creation", "modified", "modified_by"])
-    return [field for field in candidates if field in allowed]
-
-
-def _get_price_list():
-    user = frappe.session.user
-    if user and user != "Guest":
-        customer = _get_customer_for_user(user)
-        if customer:
-            group = frappe.db.get_value("Customer", customer, "customer_group")
-            if group == "Commercial" and frappe.db.exists("Price List", "Standard Selling"):
-                return "Standard Selling"
-    if frappe.db.exists("Price List", "Website Price List"):
-        return "Website Price List"
-    if frappe.db.exists("Price List", "Standard Selling"):
-        return "Standard Selling"
-    price_list = frappe.get_all("Price List", filters={"selling": 1}, fields=["name"], limit_page_length=1)
-    return price_list[0].name if price_list else None
-
-
-def _get_customer_for_user(user):
-    customer = frappe.get_all(
-        "Customer",
-        filters={"email_id": user},
-        fields=["name"],
-        limit_page_length=1,
-    )
-    if customer:
-        return customer[0].name
-
-    contact = frappe.get_all(
-        "Contact",
-        filters={"email_id": user},
-        fields=["name"],
-        limit_page_length=1,
-    )
-    if contact:
-        link = frappe.get_all(
-            "Dynamic Link",
-            filters={"parent": contact[0].name, "link_doctype": "Customer"},
-            fields=["link_name"],
-            limit_page_length=1,
-        )
-        if link:
-            return link[0].link_name
-    return None
-
-
 def _attach_prices(items, price_list):
     if not items:
         return
-    if not price_list:
-        for item in items:
-            item.price = item.get("standard_rate") or 0
-        return
+    prices = {}
+    if price_list:
+        prices = get_item_prices([item.item_code for item in items], price_list, customer=get_customer())
+    for item in items:
+        item.price = prices.get(item.item_code, item.get("standard_rate") or 0)
 
-    codes = [item.item_code for item in items if item.get("item_code")]
-    if not codes:
-        return
 
-    prices = frappe.get_all(
-        "Item Price",
-        filters={"item_code": ["in", codes], "price_list": price_list, "selling": 1},
-        fields=["item_code", "price_list_rate"],
-    )
-    price_map = {row.item_code: row.price_list_rate for row in prices}
+def _attach_ratings(items):
+    if not items:
+        return
+    summaries = get_review_summaries([item.item_code for item in items])
     for item in items:
-        item.price = price_map.get(item.item_code, item.get("standard_rate") or 0)
+        summary = summaries.get(item.item_code) or {}
+        item.rating = summary.get("average") or 0
+        item.review_count = summary.get("count") or 0
 
 
-# Cart is handled client-side for custom UX
+def _attach_stock(items):
+    if not items:
+        return
+    stock = get_stock_availability([item.item_code for item in items])
+    for item in items:
+        item.in_stock = stock[item.item_code]["in_stock"]
+